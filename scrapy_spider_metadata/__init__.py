@@ -1,9 +1,47 @@
 __version__ = "0.2.0"
 
+from ._args_cache import ArgsCacheInfo
+from ._defaults import get_spider_param_defaults
+from ._extension import SpiderMetadataExtension
+from ._factory import create_spider_class
+from ._fingerprint import get_fingerprint_manifest, get_spider_fingerprint
 from ._metadata import get_spider_metadata
-from ._params import Args
+from ._params import Args, ArgsValidationResult
+from ._preload import preload
+from ._types import FileLines
+from ._utils import (
+    DEFAULT_NORMALIZATION_PASSES,
+    NormalizationContext,
+    add_title,
+    compact_param_schema,
+    expand_param_schema,
+    hoist_json_schema_extra,
+    inline_refs,
+    remove_description,
+    remove_title,
+)
+from ._validation import ParamValidationError
 
 __all__ = [
+    "DEFAULT_NORMALIZATION_PASSES",
     "Args",
+    "ArgsCacheInfo",
+    "ArgsValidationResult",
+    "FileLines",
+    "NormalizationContext",
+    "ParamValidationError",
+    "SpiderMetadataExtension",
+    "add_title",
+    "compact_param_schema",
+    "create_spider_class",
+    "expand_param_schema",
+    "get_fingerprint_manifest",
+    "get_spider_fingerprint",
     "get_spider_metadata",
+    "get_spider_param_defaults",
+    "hoist_json_schema_extra",
+    "inline_refs",
+    "preload",
+    "remove_description",
+    "remove_title",
 ]
@@ -0,0 +1,194 @@
+"""Cache of validated spider arguments.
+
+A spider launched many times with the same arguments validates the same
+arguments every time. The cache maps a hash of the arguments to the validated
+arguments, and returns a copy of them on a hit, so that a spider cannot modify
+the arguments of another spider.
+
+Only parameter specification classes whose validation depends on nothing but
+its input can be cached: those without validator functions (which includes
+custom types, e.g. :class:`~scrapy_spider_metadata.FileLines`, that checks the
+file system), default factories or post-init hooks.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from dataclasses import is_dataclass
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ._validation import DataclassAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+_ATOMIC_TYPES = frozenset({bool, bytes, float, int, str, type(None)})
+
+
+class ArgsCacheInfo(NamedTuple):
+    """Statistics of the :attr:`~scrapy_spider_metadata.Args.args_cache_size`
+    cache of a spider class.
+    """
+
+    #: Number of spider instances which arguments were found in the cache.
+    hits: int
+    #: Number of spider instances which arguments were validated.
+    misses: int
+    #: Maximum number of entries.
+    maxsize: int
+    #: Current number of entries.
+    currsize: int
+
+
+class ArgsCache:
+    """Bounded cache of validated arguments that evicts the least recently
+    used entry when full.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[bytes, Any] = OrderedDict()
+
+    def get(self, key: bytes) -> Any:
+        """Return a copy of the arguments cached for *key*, or raise
+        :exc:`KeyError`.
+        """
+        try:
+            args = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._data.move_to_end(key)
+        self.hits += 1
+        return copy_args(args)
+
+    def set(self, key: bytes, args: Any) -> None:
+        self._data[key] = copy_args(args)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def info(self) -> ArgsCacheInfo:
+        return ArgsCacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
+def hash_args(kwargs: Mapping[str, Any], /) -> bytes | None:
+    """Return a hash of *kwargs*, or ``None`` if they are not
+    JSON-serializable.
+
+    Keys are sorted, so that the hash does not depend on argument order.
+    String values, the most common ones, are hashed as is, which is much
+    faster than serializing them as JSON; other values are serialized as JSON
+    first.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(kwargs):
+        value = kwargs[key]
+        try:
+            if isinstance(value, str):
+                tag, data = b"s", value.encode()
+            else:
+                tag = b"j"
+                data = json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+            encoded_key = key.encode()
+        except (TypeError, ValueError):
+            return None
+        digest.update(b"%d:%s%s%d:" % (len(encoded_key), encoded_key, tag, len(data)))
+        digest.update(data)
+    return digest.digest()
+
+
+def _is_pydantic_model(value: Any, /) -> bool:
+    # Without importing Pydantic, which may not be in use.
+    pydantic = sys.modules.get("pydantic")
+    return pydantic is not None and isinstance(value, pydantic.BaseModel)
+
+
+def _copy_value(value: Any, /) -> Any:
+    cls = type(value)
+    if cls in _ATOMIC_TYPES:
+        return value
+    if cls is list:
+        if all(map(_ATOMIC_TYPES.__contains__, map(type, value))):
+            return value.copy()
+        return [_copy_value(item) for item in value]
+    if cls is dict:
+        return {key: _copy_value(item) for key, item in value.items()}
+    if _is_pydantic_model(value) or is_dataclass(value):
+        return copy_args(value)
+    return copy.deepcopy(value)
+
+
+def copy_args(args: Any, /) -> Any:
+    """Return a deep copy of *args*.
+
+    Lists and dicts are copied without copying immutable items, which is
+    several times faster than :func:`copy.deepcopy` for large lists of
+    strings.
+    """
+    if isinstance(args, dict):
+        return _copy_value(args)
+    if not hasattr(args, "__dict__"):
+        # e.g. dataclasses with slots
+        return copy.deepcopy(args)
+    new_args = copy.copy(args)
+    # Pydantic 1.x models share __dict__ with the copied model.
+    fields = {key: _copy_value(value) for key, value in vars(args).items()}
+    object.__setattr__(new_args, "__dict__", fields)
+    extra = getattr(new_args, "__pydantic_extra__", None)
+    if extra:
+        new_args.__pydantic_extra__ = _copy_value(extra)
+    return new_args
+
+
+def _has_impure_core_schema(schema: Any, /) -> bool:
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "default_factory" in node or "post_init" in node:
+                return True
+            node_type = node.get("type")
+            if isinstance(node_type, str) and node_type.startswith("function-"):
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return False
+
+
+def _has_impure_pydantic1_fields(param_model: Any, /) -> bool:
+    if (
+        param_model.__validators__
+        or param_model.__pre_root_validators__
+        or param_model.__post_root_validators__
+    ):
+        return True
+    for field in param_model.__fields__.values():
+        if field.default_factory is not None:
+            return True
+        if hasattr(field.type_, "__fields__"):
+            if _has_impure_pydantic1_fields(field.type_):
+                return True
+        elif hasattr(field.type_, "__get_validators__"):
+            return True
+    return False
+
+
+def is_cacheable(param_model: Any, adapter: Any, /) -> bool:
+    """Return ``True`` if validating the same arguments with *param_model*
+    always gives the same result, without side effects.
+    """
+    if isinstance(adapter, DataclassAdapter):
+        return adapter.is_cacheable
+    if adapter is not None:
+        return not _has_impure_core_schema(adapter.core_schema)
+    core_schema = getattr(param_model, "__pydantic_core_schema__", None)
+    if core_schema is not None:
+        return not _has_impure_core_schema(core_schema)
+    return not _has_impure_pydantic1_fields(param_model)
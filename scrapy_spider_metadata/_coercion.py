@@ -0,0 +1,175 @@
+"""Conversion of string spider arguments into parameter types.
+
+Spider arguments coming from the command line or from a scheduler are always
+strings. Pydantic converts strings into scalar types natively, and faster than
+any Python code could, but it cannot convert a string into a list. A coercion
+plan is compiled once per parameter model to convert string arguments for list
+parameters, from comma-separated values or JSON, before validation. List items
+are left for Pydantic to convert.
+
+Coercers raise :exc:`ValueError` for strings they cannot convert, in which case
+the raw string is left for Pydantic to validate (and report).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+Coercer = Callable[[str], Any]
+CoercionPlan = dict[str, Coercer]
+
+_NONE_TYPE = type(None)
+
+
+def coerce_list(value: str, /) -> list[Any]:
+    """Convert a JSON array or a comma-separated string into a list.
+
+    >>> coerce_list("a, b")
+    ['a', 'b']
+    >>> coerce_list('["a,b", 1]')
+    ['a,b', 1]
+    >>> coerce_list("")
+    []
+    """
+    stripped = value.strip()
+    if stripped.startswith("["):
+        items = json.loads(stripped)
+        if not isinstance(items, list):
+            raise ValueError(f"{value!r} is not a list")
+        return items
+    if not stripped:
+        return []
+    return [item.strip() for item in stripped.split(",")]
+
+
+def get_coercer(annotation: Any, /) -> Coercer | None:
+    """Return a function that converts a string argument for a parameter of
+    type *annotation* before validation, or ``None`` if Pydantic can validate
+    string arguments for that type directly.
+    """
+    if get_origin(annotation) is Union:
+        non_none_args = [arg for arg in get_args(annotation) if arg is not _NONE_TYPE]
+        if len(non_none_args) != 1:
+            return None
+        annotation = non_none_args[0]
+    if annotation is list or get_origin(annotation) is list:
+        return coerce_list
+    return None
+
+
+def _get_pydantic2_plan(param_model: Any, /) -> CoercionPlan | None:
+    from annotated_types import BaseMetadata
+
+    decorators = param_model.__pydantic_decorators__
+    config = getattr(param_model, "model_config", None)
+    if config is None:
+        # pydantic dataclass
+        config = param_model.__pydantic_config__
+    if (
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+        or config.get("strict")
+    ):
+        return None
+    fields = getattr(param_model, "model_fields", None)
+    if fields is None:
+        # pydantic dataclass
+        fields = param_model.__pydantic_fields__
+    plan = {}
+    for name, field in fields.items():
+        if field.validation_alias is not None or any(
+            not isinstance(item, BaseMetadata) or getattr(item, "strict", False)
+            for item in field.metadata
+        ):
+            continue
+        coercer = get_coercer(field.annotation)
+        if coercer is not None:
+            plan[field.alias or name] = coercer
+    return plan or None
+
+
+def _get_pydantic1_plan(param_model: Any, /) -> CoercionPlan | None:
+    if (
+        param_model.__validators__
+        or param_model.__pre_root_validators__
+        or param_model.__post_root_validators__
+    ):
+        return None
+    plan = {}
+    for field in param_model.__fields__.values():
+        coercer = get_coercer(field.outer_type_)
+        if coercer is not None:
+            plan[field.alias] = coercer
+    return plan or None
+
+
+def _get_typeddict_plan(param_model: Any, /) -> CoercionPlan | None:
+    config = getattr(param_model, "__pydantic_config__", {})
+    if config.get("strict"):
+        return None
+    plan = {}
+    for name, annotation in get_type_hints(param_model, include_extras=True).items():
+        coercer = get_coercer(annotation)
+        if coercer is not None:
+            plan[name] = coercer
+    return plan or None
+
+
+def get_coercion_plan(param_model: Any, /) -> CoercionPlan | None:
+    """Return the coercion plan of a parameter specification class, or
+    ``None`` if no argument needs converting before validation.
+
+    The plan maps argument names to the function that converts them from a
+    string. Classes that define validators or strict mode get no plan, as they
+    must receive unmodified arguments.
+    """
+    if hasattr(param_model, "__pydantic_decorators__"):
+        return _get_pydantic2_plan(param_model)
+    if hasattr(param_model, "__fields__"):
+        return _get_pydantic1_plan(param_model)
+    return _get_typeddict_plan(param_model)
+
+
+def coerce_args(plan: CoercionPlan, kwargs: Mapping[str, Any], /) -> dict[str, Any]:
+    """Return a copy of *kwargs* with string values converted according to
+    *plan*.
+    """
+    result = dict(kwargs)
+    for key, coercer in plan.items():
+        value = result.get(key)
+        if isinstance(value, str):
+            try:
+                result[key] = coercer(value)
+            except ValueError:
+                continue
+    return result
+
+
+def coerce_column(coercer: Coercer, values: Iterable[Any], /) -> list[Any]:
+    """Return *values*, a column of arguments for the same parameter, with
+    strings converted with *coercer*.
+    """
+    result = []
+    for value in values:
+        if isinstance(value, str):
+            try:
+                result.append(coercer(value))
+            except ValueError:
+                result.append(value)
+        else:
+            result.append(value)
+    return result
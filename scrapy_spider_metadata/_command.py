@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import argparse
+import json
+import optparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, TypeVar
+
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from scrapy.settings import Settings
+
+from ._fingerprint import get_spider_fingerprint
+from ._metadata import get_spider_metadata
+from ._params import Args, _get_param_spec
+from ._preload import get_spider_loader
+
+if TYPE_CHECKING:
+    from scrapy.settings import BaseSettings
+    from scrapy.spiderloader import SpiderLoaderProtocol
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Spider loader of the current process, i.e. of the command process or of a
+# worker process.
+_spider_loader: SpiderLoaderProtocol | None = None
+
+
+def _init_process(settings: dict[str, Any]) -> None:
+    global _spider_loader  # noqa: PLW0603
+    _spider_loader = get_spider_loader(Settings(settings))
+
+
+def _export_metadata(
+    name: str, *, normalize: bool, canonical: bool
+) -> tuple[Any, float]:
+    assert _spider_loader is not None
+    start_time = perf_counter()
+    spider_cls = _spider_loader.load(name)
+    metadata = get_spider_metadata(spider_cls, normalize=normalize, canonical=canonical)
+    return {"spider": name, "metadata": metadata}, perf_counter() - start_time
+
+
+def _export_fingerprint(name: str) -> tuple[Any, float]:
+    assert _spider_loader is not None
+    start_time = perf_counter()
+    fingerprint = get_spider_fingerprint(_spider_loader.load(name))
+    return {"spider": name, "fingerprint": fingerprint}, perf_counter() - start_time
+
+
+def _get_arg_set_error(arg_set: Any) -> str | None:
+    if not isinstance(arg_set, dict):
+        return "Expected a JSON object"
+    if not isinstance(arg_set.get("args", {}), dict):
+        return "Expected a JSON object as args"
+    return None
+
+
+def _validate_args(line: str) -> tuple[Any, float]:
+    """Validate the argument set of a line of the ``--validate-args`` file.
+
+    Lines are decoded here, in worker processes when using several jobs, and
+    lines that are not valid JSON or not argument sets are reported as
+    invalid.
+    """
+    assert _spider_loader is not None
+    start_time = perf_counter()
+    error: str | None
+    try:
+        arg_set = json.loads(line)
+    except ValueError as e:
+        error = f"Invalid JSON: {e}"
+    else:
+        error = _get_arg_set_error(arg_set)
+    if error is not None:
+        result: dict[str, Any] = {"spider": None, "args": None, "valid": False}
+        result["errors"] = [{"msg": error}]
+        return result, perf_counter() - start_time
+    name = arg_set.get("spider")
+    args = arg_set.get("args", {})
+    result = {"spider": name, "args": args, "valid": True}
+    try:
+        spider_cls = _spider_loader.load(str(name))
+    except KeyError:
+        result.update(valid=False, errors=[{"msg": f"Spider not found: {name}"}])
+        return result, perf_counter() - start_time
+    if issubclass(spider_cls, Args):
+        param_spec = _get_param_spec(spider_cls)
+        try:
+            param_spec.validate(args)
+        except param_spec.validation_error as e:
+            errors = json.loads(json.dumps(e.errors(), default=str))
+            result.update(valid=False, errors=errors)
+    return result, perf_counter() - start_time
+
+
+def _map(
+    func: Callable[[_T], _R], items: list[_T], settings: BaseSettings, jobs: int
+) -> list[_R]:
+    """Return the result of *func* for each of *items*, using up to *jobs*
+    processes.
+    """
+    settings_dict = settings.copy_to_dict()
+    if jobs <= 1 or len(items) <= 1:
+        _init_process(settings_dict)
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_process, initargs=(settings_dict,)
+    ) as executor:
+        chunksize = max(1, len(items) // (jobs * 4))
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def _read_arg_sets(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as file:  # noqa: PTH123
+        return [line for line in file if line.strip()]
+
+
+def add_arguments(parser: argparse.ArgumentParser | optparse.OptionParser) -> None:
+    """Add the options of the ``spidermetadata`` command to *parser*.
+
+    Scrapy < 2.6 uses :mod:`optparse` instead of :mod:`argparse`, and the
+    options are defined in a way that both support.
+    """
+    add_argument: Callable[..., Any]
+    if isinstance(parser, optparse.OptionParser):
+        add_argument = parser.add_option
+    else:
+        add_argument = parser.add_argument
+    add_argument(
+        "--normalize",
+        action="store_true",
+        help="normalize the parameter schemas",
+    )
+    add_argument(
+        "--canonical",
+        action="store_true",
+        help="sort the parameter schemas into a canonical order",
+    )
+    add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="output format (default: json)",
+    )
+    add_argument(
+        "--fingerprints",
+        action="store_true",
+        help=(
+            "export the fingerprint of the normalized metadata of each spider "
+            "instead of the metadata"
+        ),
+    )
+    add_argument(
+        "--validate-args",
+        metavar="FILE",
+        help=(
+            "validate the argument sets of a JSON Lines file instead of "
+            'exporting metadata, one {"spider": ..., "args": {...}} object '
+            "per line"
+        ),
+    )
+    add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of processes to use (default: 1)",
+    )
+    add_argument(
+        "--timings",
+        action="store_true",
+        help="print the time spent on each spider or argument set to stderr",
+    )
+
+
+def run(
+    settings: BaseSettings,
+    names: list[str],
+    opts: argparse.Namespace | optparse.Values,
+) -> int:
+    """Run the ``spidermetadata`` command and return its exit code."""
+    start_time = perf_counter()
+    if opts.validate_args:
+        arg_sets = _read_arg_sets(opts.validate_args)
+        results = _map(_validate_args, arg_sets, settings, opts.jobs)
+        output: Any = [result for result, _ in results]
+        summary = f"Validated {len(results)} argument sets"
+        exitcode = 0 if all(result["valid"] for result in output) else 1
+    else:
+        available = get_spider_loader(settings).list()
+        unknown = sorted(set(names) - set(available))
+        if unknown:
+            raise UsageError(f"Spider not found: {', '.join(unknown)}")
+        names = names or sorted(available)
+        if opts.fingerprints:
+            results = _map(_export_fingerprint, names, settings, opts.jobs)
+            output = {result["spider"]: result["fingerprint"] for result, _ in results}
+            summary = f"Exported the fingerprints of {len(results)} spiders"
+        else:
+            func = partial(
+                _export_metadata, normalize=opts.normalize, canonical=opts.canonical
+            )
+            results = _map(func, names, settings, opts.jobs)
+            output = {result["spider"]: result["metadata"] for result, _ in results}
+            summary = f"Exported the metadata of {len(results)} spiders"
+        exitcode = 0
+
+    if opts.format == "ndjson":
+        for result, _ in results:
+            print(json.dumps(result))
+    else:
+        print(json.dumps(output, indent=2))
+
+    if opts.timings:
+        for result, timing in results:
+            print(f"{result['spider']}: {timing:.6f}s", file=sys.stderr)
+    elapsed = perf_counter() - start_time
+    print(f"{summary} in {elapsed:.3f}s", file=sys.stderr)
+    return exitcode
+
+
+class Command(ScrapyCommand):
+    """``spidermetadata`` Scrapy command."""
+
+    requires_project = True
+    requires_crawler_process = False
+    default_settings: ClassVar[dict[str, Any]] = {"LOG_ENABLED": False}
+
+    def syntax(self) -> str:
+        return "[options] [spider ...]"
+
+    def short_desc(self) -> str:
+        return "Export spider metadata or validate spider arguments"
+
+    def long_desc(self) -> str:
+        return (
+            "Print the metadata of the given spiders, or of all the spiders of "
+            "the project, as JSON. With --validate-args, validate the argument "
+            "sets of a JSON Lines file instead."
+        )
+
+    def add_options(
+        self, parser: argparse.ArgumentParser | optparse.OptionParser
+    ) -> None:
+        super().add_options(parser)  # type: ignore[arg-type]  # Scrapy < 2.6
+        add_arguments(parser)
+
+    def run(self, args: list[str], opts: argparse.Namespace | optparse.Values) -> None:
+        assert self.settings is not None
+        self.exitcode = run(self.settings, args, opts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the ``scrapy-spider-metadata`` console script, the
+    ``scrapy spidermetadata`` command for environments without the
+    ``scrapy`` command, e.g. outside a project directory.
+    """
+    from scrapy.utils.conf import arglist_to_dict
+    from scrapy.utils.project import get_project_settings
+
+    parser = argparse.ArgumentParser(
+        prog="scrapy-spider-metadata", description=Command().long_desc()
+    )
+    parser.add_argument("spiders", nargs="*", metavar="spider")
+    parser.add_argument(
+        "-s",
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="set/override setting (may be repeated)",
+    )
+    add_arguments(parser)
+    opts = parser.parse_args(argv)
+    settings = get_project_settings()
+    try:
+        settings.setdict(arglist_to_dict(opts.set), priority="cmdline")
+    except ValueError:
+        parser.error("Invalid -s value, use -s NAME=VALUE")
+    try:
+        return run(settings, opts.spiders, opts)
+    except UsageError as e:
+        parser.error(str(e))
@@ -0,0 +1,170 @@
+"""Pydantic 1.x and 2.x compatibility.
+
+The Pydantic version is detected once, the first time Pydantic is needed, and
+the functions for that version are bound then, so that code paths do not try a
+Pydantic 2.x API and fall back to Pydantic 1.x on :exc:`AttributeError` or
+:exc:`ImportError` on every call.
+
+Pydantic is not imported on import of this module, so that spiders with
+:ref:`dataclass parameters <dataclass-params>` do not import it.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from functools import cache, partial
+from operator import methodcaller
+from typing import Any, Callable, NamedTuple
+
+# Function that returns the JSON-serializable default values of the optional
+# parameters, in order, and names of the required parameters.
+ParamDefaults = tuple[Callable[[], dict[str, Any]], list[str]]
+
+
+def call_default_factory(
+    factory: Callable[..., Any], args: tuple[Any, ...], serialize: Callable[[Any], Any]
+) -> Any:
+    return serialize(factory(*args))
+
+
+def call_default_getters(
+    getters: list[tuple[str, Callable[[], Any]]],
+) -> dict[str, Any]:
+    return {key: get_default() for key, get_default in getters}
+
+
+class Pydantic(NamedTuple):
+    """Pydantic API of the installed Pydantic version."""
+
+    #: ``True`` for Pydantic 2.x, ``False`` for Pydantic 1.x.
+    v2: bool
+    BaseModel: type[Any]
+    ValidationError: type[ValueError]
+    #: ``None`` with Pydantic 1.x.
+    TypeAdapter: Any
+    #: Return the JSON Schema of a model class.
+    model_json_schema: Callable[[type[Any]], dict[str, Any]]
+    #: Return a model instance as JSON-serializable data.
+    model_dump: Callable[[Any], Any]
+    #: Return a function that returns the default values of the optional
+    #: fields of a parameter specification class, and the names of its
+    #: required fields, keyed as in its JSON Schema.
+    param_defaults: Callable[[Any], ParamDefaults]
+
+
+def _pydantic1_model_dump(args: Any, /) -> Any:
+    return json.loads(args.json())
+
+
+def _pydantic1_param_defaults(param_model: Any, /) -> ParamDefaults:
+    from pydantic.json import pydantic_encoder
+
+    def serialize(value: Any) -> Any:
+        return json.loads(json.dumps(value, default=pydantic_encoder))
+
+    defaults: list[tuple[str, Callable[[], Any]]] = []
+    required: list[str] = []
+    for field in param_model.__fields__.values():
+        get_default: Callable[[], Any]
+        if field.required:
+            required.append(field.alias)
+            continue
+        if field.default_factory is not None:
+            get_default = partial(
+                call_default_factory, field.default_factory, (), serialize
+            )
+        else:
+            get_default = partial(copy.deepcopy, serialize(field.default))
+        defaults.append((field.alias, get_default))
+    return partial(call_default_getters, defaults), required
+
+
+def _get_pydantic2_defaults(fields: list[tuple[str, str, Any, Any]]) -> dict[str, Any]:
+    """Return the JSON-serializable default values of *fields*, a list of
+    ``(key, name, field, serialized default)``.
+
+    Default factories that take validated data (Pydantic 2.10+) get the
+    default values of the previous fields, keyed by field name, as they would
+    during validation. Fields which default factory needs the value of a
+    required field, i.e. raises :exc:`KeyError`, are left out, since their
+    default value is only known at run time.
+    """
+    from pydantic_core import to_jsonable_python
+
+    data: dict[str, Any] = {}
+    defaults: dict[str, Any] = {}
+    for key, name, field, serialized_default in fields:
+        if field.default_factory is None:
+            data[name] = field.default
+            defaults[key] = copy.deepcopy(serialized_default)
+            continue
+        if getattr(field, "default_factory_takes_validated_data", False):
+            try:
+                value = field.default_factory(data)
+            except KeyError:
+                continue
+        else:
+            value = field.default_factory()
+        data[name] = value
+        defaults[key] = to_jsonable_python(value)
+    return defaults
+
+
+def _pydantic2_param_defaults(param_model: Any, /) -> ParamDefaults:
+    from pydantic_core import to_jsonable_python
+    from typing_extensions import is_typeddict
+
+    if is_typeddict(param_model):
+        required_keys = param_model.__required_keys__
+        return dict, [
+            key for key in param_model.__annotations__ if key in required_keys
+        ]
+    fields = getattr(param_model, "model_fields", None)
+    if fields is None:
+        # pydantic dataclass
+        fields = param_model.__pydantic_fields__
+    defaults: list[tuple[str, str, Any, Any]] = []
+    required: list[str] = []
+    for name, field in fields.items():
+        if getattr(field, "init", None) is False:
+            continue
+        alias = field.validation_alias
+        key = alias if isinstance(alias, str) else field.alias or name
+        if field.is_required():
+            required.append(key)
+            continue
+        serialized_default = (
+            None
+            if field.default_factory is not None
+            else to_jsonable_python(field.default)
+        )
+        defaults.append((key, name, field, serialized_default))
+    return partial(_get_pydantic2_defaults, defaults), required
+
+
+@cache
+def get_pydantic() -> Pydantic:
+    """Import Pydantic and return the API of the installed version."""
+    import pydantic
+
+    if int(pydantic.VERSION.split(".", maxsplit=1)[0]) < 2:
+        return Pydantic(
+            v2=False,
+            BaseModel=pydantic.BaseModel,
+            ValidationError=pydantic.ValidationError,
+            TypeAdapter=None,
+            model_json_schema=methodcaller("schema"),
+            model_dump=_pydantic1_model_dump,
+            param_defaults=_pydantic1_param_defaults,
+        )
+    return Pydantic(
+        v2=True,
+        BaseModel=pydantic.BaseModel,
+        ValidationError=pydantic.ValidationError,
+        TypeAdapter=pydantic.TypeAdapter,
+        # methodcaller() avoids the overhead of a Python function call.
+        model_json_schema=methodcaller("model_json_schema"),
+        model_dump=methodcaller("model_dump", mode="json"),
+        param_defaults=_pydantic2_param_defaults,
+    )
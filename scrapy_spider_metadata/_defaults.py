@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from ._params import Args
+from ._preload import get_spider_classes
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from scrapy import Spider
+    from scrapy.spiderloader import SpiderLoaderProtocol
+
+
+def get_spider_param_defaults(
+    spiders: Iterable[type[Spider]] | SpiderLoaderProtocol,
+) -> dict[str, dict[str, Any]]:
+    """Return the :meth:`default arguments <Args.get_param_defaults>` of each
+    of *spiders* that defines :ref:`parameters <params>`, keyed and sorted by
+    spider name.
+
+    No spider is created.
+
+    :param spiders: Spider classes, or a :ref:`spider loader
+        <topics-api-spiderloader>` to get the default arguments of all the
+        spiders of a project.
+    """
+    defaults = {
+        spider_cls.name: spider_cls.get_param_defaults()
+        for spider_cls in get_spider_classes(spiders)
+        if issubclass(spider_cls, Args)
+    }
+    return dict(sorted(defaults.items()))
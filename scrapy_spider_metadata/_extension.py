@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import copy
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from . import _profiling
+from ._fingerprint import get_spider_fingerprint
+from ._metadata import _get_normalized_metadata
+from ._params import Args, _get_param_spec
+from ._preload import get_spider_loader, preload
+
+if TYPE_CHECKING:
+    from scrapy import Spider
+    from scrapy.crawler import Crawler
+    from scrapy.settings import BaseSettings
+    from scrapy.spiderloader import SpiderLoaderProtocol
+
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+STATS_PREFIX = "spider_metadata"
+logger = getLogger(__name__)
+
+_preloaded = False
+
+
+def _preload_spider(
+    spider_loader: SpiderLoaderProtocol, name: str
+) -> dict[type[Spider], float]:
+    try:
+        return preload([spider_loader.load(name)])
+    except Exception:
+        logger.warning(f"Could not preload spider {name!r}", exc_info=True)
+        return {}
+
+
+def _preload_project(settings: BaseSettings) -> None:
+    """Preload the metadata of the spiders of the project.
+
+    Errors are logged, so that a spider that cannot be loaded or whose
+    metadata cannot be generated does not break every crawl of the project.
+    """
+    global _preloaded  # noqa: PLW0603
+    if _preloaded:
+        return
+    _preloaded = True
+    try:
+        spider_loader = get_spider_loader(settings)
+        names = spider_loader.list()
+    except Exception:
+        logger.warning("Could not load the spiders to preload", exc_info=True)
+        return
+    timings: dict[type[Spider], float] = {}
+    for name in names:
+        timings.update(_preload_spider(spider_loader, name))
+    for spider_cls, timing in timings.items():
+        logger.debug(f"Preloaded spider {spider_cls.name!r} in {timing:.6f}s")
+    logger.info(
+        f"Preloaded the metadata of {len(timings)} spiders in "
+        f"{sum(timings.values()):.6f}s"
+    )
+
+
+class SpiderMetadataExtension:
+    """Scrapy extension that exposes the :ref:`metadata <metadata>` of the
+    running spider, so that it can be read without loading the spider code.
+
+    To enable it, add it to the :setting:`EXTENSIONS` setting:
+
+    .. code-block:: python
+
+        EXTENSIONS = {
+            "scrapy_spider_metadata.SpiderMetadataExtension": 0,
+        }
+
+    See :ref:`extension` for the settings that configure it.
+    """
+
+    def __init__(self, crawler: Crawler):
+        if crawler.settings.getbool("SPIDER_METADATA_PRELOAD"):
+            _preload_project(crawler.settings)
+        if not crawler.settings.getbool("SPIDER_METADATA_STATS", True):
+            raise NotConfigured
+        self.stats = crawler.stats
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        return cls(crawler)
+
+    def spider_opened(self, spider: Spider) -> None:
+        assert self.stats is not None
+        spider_cls = spider.__class__
+        # A copy, since the cached metadata must not be modified.
+        self.stats.set_value(
+            f"{STATS_PREFIX}/metadata",
+            copy.deepcopy(_get_normalized_metadata(spider_cls)),
+        )
+        try:
+            fingerprint = get_spider_fingerprint(spider_cls)
+        except (TypeError, ValueError):  # not JSON-serializable
+            logger.warning(
+                f"Could not compute the fingerprint of spider {spider.name!r}: "
+                f"its metadata is not JSON-serializable"
+            )
+        else:
+            self.stats.set_value(f"{STATS_PREFIX}/fingerprint", fingerprint)
+        if _profiling.PROFILER is not None:
+            for stage, values in _profiling.PROFILER.get_stats(spider_cls).items():
+                for key, value in values.items():
+                    self.stats.set_value(f"{STATS_PREFIX}/profile/{stage}/{key}", value)
+        if not isinstance(spider, Args):
+            return
+        self.stats.set_value(
+            f"{STATS_PREFIX}/args", _get_param_spec(spider_cls).dump(spider.args)
+        )
+        self.stats.set_value(
+            f"{STATS_PREFIX}/args_validation_time", spider._args_validation_time
+        )
@@ -0,0 +1,346 @@
+"""Creation of spider classes at run time, e.g. one per tenant of a
+multi-tenant project, from a specification of their parameters.
+
+Parameter specification classes are pooled: spider classes with structurally
+identical parameters share the same class, and the same validator and JSON
+Schema, so that creating many spider classes does not create as many
+parameter specification classes. Pools only keep weak references, so unused
+classes can be garbage-collected.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import re
+import sys
+import types
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, Optional
+from weakref import WeakValueDictionary
+
+from scrapy import Spider
+
+from . import _profiling
+from ._compat import get_pydantic
+from ._params import _PARAM_SPECS, Args, _ParamSpec
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Mapping
+
+_REQUIRED = object()
+# Default of list parameters that are neither required nor have a default in
+# their schema, i.e. parameters with default_factory=list.
+_EMPTY_LIST = object()
+_JSON_TYPES = {"boolean": bool, "integer": int, "number": float, "string": str}
+# Keywords of a parameter schema that are converted into the parameter type,
+# default value, title or description. Other keywords are kept as extra
+# schema data.
+_TYPE_KEYWORDS = frozenset({"anyOf", "const", "enum", "items", "type"})
+_FIELD_KEYWORDS = frozenset({"default", "description", "title"})
+# Validation keywords of a parameter schema that are converted into
+# pydantic.Field arguments, with Pydantic 2.x and 1.x.
+_CONSTRAINT_KEYWORDS = {
+    "exclusiveMaximum": ("lt", "lt"),
+    "exclusiveMinimum": ("gt", "gt"),
+    "maxItems": ("max_length", "max_items"),
+    "maxLength": ("max_length", "max_length"),
+    "maximum": ("le", "le"),
+    "minItems": ("min_length", "min_items"),
+    "minLength": ("min_length", "min_length"),
+    "minimum": ("ge", "ge"),
+    "multipleOf": ("multiple_of", "multiple_of"),
+    "pattern": ("pattern", "regex"),
+}
+# Validation keywords of a parameter schema that are not supported, rather
+# than kept as extra schema data that would not be enforced.
+_UNSUPPORTED_KEYWORDS = frozenset(
+    {
+        "$ref",
+        "additionalProperties",
+        "allOf",
+        "contains",
+        "dependentRequired",
+        "dependentSchemas",
+        "else",
+        "if",
+        "maxContains",
+        "maxProperties",
+        "minContains",
+        "minProperties",
+        "not",
+        "oneOf",
+        "patternProperties",
+        "prefixItems",
+        "properties",
+        "propertyNames",
+        "then",
+        "unevaluatedItems",
+        "unevaluatedProperties",
+        "uniqueItems",
+    }
+)
+
+_PARAM_MODELS: WeakValueDictionary[Hashable, type[Any]] = WeakValueDictionary()
+_SHARED_PARAM_SPECS: WeakValueDictionary[tuple[type[Any], int], _ParamSpec] = (
+    WeakValueDictionary()
+)
+
+FieldSpec = tuple[Any, Any, dict[str, Any]]
+
+
+def _get_type_from_schema(schema: Mapping[str, Any], name: str) -> Any:
+    anyof = schema.get("anyOf")
+    if anyof is not None:
+        non_null = [entry for entry in anyof if entry.get("type") != "null"]
+        if len(non_null) != 1 or len(anyof) != 2:
+            raise ValueError(f"Unsupported anyOf in the schema of {name!r}")
+        merged = {key: value for key, value in schema.items() if key != "anyOf"}
+        return Optional[_get_type_from_schema({**merged, **non_null[0]}, name)]
+    if "enum" in schema:
+        return Literal[tuple(schema["enum"])]
+    if "const" in schema:
+        return Literal[schema["const"]]
+    json_type = schema.get("type")
+    if json_type == "array":
+        items = schema.get("items")
+        if not isinstance(items, dict):
+            raise ValueError(f"Missing items in the schema of {name!r}")
+        for key in items:
+            if key in _CONSTRAINT_KEYWORDS or key in _UNSUPPORTED_KEYWORDS:
+                raise ValueError(
+                    f"Unsupported keyword {key!r} in the items of {name!r}"
+                )
+        return list[_get_type_from_schema(items, name)]  # type: ignore[misc]
+    if json_type not in _JSON_TYPES:
+        raise ValueError(f"Unsupported type {json_type!r} in the schema of {name!r}")
+    return _JSON_TYPES[json_type]
+
+
+def _get_constraints(
+    param: Mapping[str, Any], name: str, use_dataclass: bool
+) -> dict[str, Any]:
+    """Return the :func:`pydantic.Field` arguments for the validation
+    keywords of *param*, including those of the non-null type of an
+    optional parameter.
+    """
+    keywords = dict(param)
+    for entry in param.get("anyOf", ()):
+        if entry.get("type") != "null":
+            keywords.update(entry)
+    constraints = {}
+    for key, value in keywords.items():
+        if key in _UNSUPPORTED_KEYWORDS:
+            raise ValueError(f"Unsupported keyword {key!r} in the schema of {name!r}")
+        if key not in _CONSTRAINT_KEYWORDS:
+            continue
+        if use_dataclass:
+            raise ValueError(
+                f"Unsupported keyword {key!r} in the schema of {name!r}, "
+                f"dataclasses do not support validation constraints"
+            )
+        v2_name, v1_name = _CONSTRAINT_KEYWORDS[key]
+        constraints[v2_name if get_pydantic().v2 else v1_name] = value
+    return constraints
+
+
+def _get_fields_from_schema(
+    schema: Mapping[str, Any], use_dataclass: bool
+) -> dict[str, FieldSpec]:
+    required = set(schema.get("required", ()))
+    fields = {}
+    for name, param in schema.get("properties", {}).items():
+        constraints = _get_constraints(param, name, use_dataclass)
+        annotation = _get_type_from_schema(param, name)
+        if "default" in param:
+            default = param["default"]
+        elif name in required:
+            default = _REQUIRED
+        elif param.get("type") == "array":
+            default = _EMPTY_LIST
+        else:
+            annotation = Optional[annotation]
+            default = None
+        extra = {key: param[key] for key in ("title", "description") if key in param}
+        extra.update(constraints)
+        json_schema_extra = {
+            key: value
+            for key, value in param.items()
+            if key not in _TYPE_KEYWORDS
+            and key not in _FIELD_KEYWORDS
+            and key not in _CONSTRAINT_KEYWORDS
+        }
+        if json_schema_extra:
+            extra["json_schema_extra"] = json_schema_extra
+        fields[name] = (annotation, default, extra)
+    return fields
+
+
+def _get_fields(fields: Mapping[str, Any]) -> dict[str, FieldSpec]:
+    result: dict[str, FieldSpec] = {}
+    for name, spec in fields.items():
+        if isinstance(spec, tuple):
+            annotation, default = spec
+            if default is ...:
+                default = _REQUIRED
+        else:
+            annotation, default = spec, _REQUIRED
+        result[name] = (annotation, default, {})
+    return result
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return dict, tuple((key, _freeze(item)) for key, item in value.items())
+    # Type included so that e.g. True and 1 are different.
+    return type(value), value
+
+
+def _create_pydantic_model(name: str, fields: dict[str, FieldSpec]) -> type[Any]:
+    pydantic = get_pydantic()
+    from pydantic import Field, create_model
+
+    definitions: dict[str, Any] = {}
+    for field_name, (annotation, default, extra) in fields.items():
+        field_kwargs = dict(extra)
+        if extra and not pydantic.v2:
+            # Pydantic 1.x adds extra keyword arguments to the schema.
+            field_kwargs.update(field_kwargs.pop("json_schema_extra", {}))
+        if default is _EMPTY_LIST:
+            field_kwargs["default_factory"] = list
+        else:
+            field_kwargs["default"] = ... if default is _REQUIRED else default
+        definitions[field_name] = (annotation, Field(**field_kwargs))
+    return create_model(name, __module__=__name__, **definitions)  # type: ignore[no-any-return]
+
+
+def _create_dataclass(name: str, fields: dict[str, FieldSpec]) -> type[Any]:
+    definitions = []
+    for field_name, (annotation, default, extra) in fields.items():
+        field_kwargs: dict[str, Any] = {"metadata": extra}
+        if default is _EMPTY_LIST:
+            field_kwargs["default_factory"] = list
+        elif isinstance(default, (list, dict, set)):
+            field_kwargs["default_factory"] = partial(copy.deepcopy, default)
+        elif default is not _REQUIRED:
+            field_kwargs["default"] = default
+        definitions.append((field_name, annotation, dataclasses.field(**field_kwargs)))
+    # Parameters are passed as keyword arguments, so required parameters can
+    # come after optional ones.
+    kwargs = {"kw_only": True} if sys.version_info >= (3, 10) else {}
+    return dataclasses.make_dataclass(
+        name,
+        definitions,
+        namespace={"__module__": __name__},
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def _get_param_model(
+    name: str, fields: dict[str, FieldSpec], use_dataclass: bool
+) -> type[Any]:
+    """Return a parameter specification class named *name* with *fields*,
+    reusing the last one created with the same name and fields, if still in
+    use.
+    """
+    create = _create_dataclass if use_dataclass else _create_pydantic_model
+    key = (
+        name,
+        use_dataclass,
+        tuple(
+            (field_name, annotation, _freeze(default), _freeze(extra))
+            for field_name, (annotation, default, extra) in fields.items()
+        ),
+    )
+    try:
+        return _PARAM_MODELS[key]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable default or annotation
+        return create(name, fields)
+    param_model = _PARAM_MODELS[key] = create(name, fields)
+    return param_model
+
+
+def _get_class_name(name: str) -> str:
+    words = re.split(r"[\W_]+", name)
+    return "".join(word[:1].upper() + word[1:] for word in words) + "Spider"
+
+
+def create_spider_class(
+    name: str,
+    params: Mapping[str, Any] | type[Any] | None = None,
+    *,
+    schema: Mapping[str, Any] | None = None,
+    base: type[Spider] = Spider,
+    metadata: dict[str, Any] | None = None,
+    class_name: str | None = None,
+    params_class_name: str = "Params",
+    use_dataclass: bool = False,
+    attrs: Mapping[str, Any] | None = None,
+) -> type[Any]:
+    """Create a spider class with :ref:`parameters <params>`.
+
+    :param name: The :attr:`~scrapy.Spider.name` of the spider.
+    :param params: The parameters, as a :ref:`parameter specification class
+        <define-params>`, or as a dict of parameter names to types (for
+        required parameters) or to ``(type, default)`` tuples.
+    :param schema: The parameters as a JSON Schema, e.g. as returned by
+        :meth:`Args.get_param_schema() <scrapy_spider_metadata.Args.get_param_schema>`,
+        instead of *params*. Supported types are those supported by
+        :ref:`dataclass parameters <dataclass-params>`, with enums as
+        :data:`~typing.Literal`. The ``minimum``, ``maximum``,
+        ``exclusiveMinimum``, ``exclusiveMaximum``, ``multipleOf``,
+        ``minLength``, ``maxLength``, ``pattern``, ``minItems`` and
+        ``maxItems`` validation keywords become :func:`pydantic.Field`
+        constraints, which *use_dataclass* does not support. Other
+        validation keywords, e.g. ``uniqueItems``, raise :exc:`ValueError`.
+    :param base: The base spider class.
+    :param metadata: The :ref:`metadata <metadata>` of the spider.
+    :param class_name: The name of the spider class. Defaults to a name based
+        on *name*, e.g. ``BooksToscrapeSpider`` for ``books_toscrape``.
+    :param params_class_name: The name of the parameter specification class
+        created from *params* or *schema*.
+    :param use_dataclass: Create a :ref:`dataclass <dataclass-params>`
+        instead of a `pydantic.BaseModel`_ subclass from *params* or *schema*.
+    :param attrs: Additional attributes of the spider class, e.g.
+        ``start_urls`` or methods.
+    """
+    if params is not None and schema is not None:
+        raise ValueError("Pass either params or schema, not both")
+    namespace: dict[str, Any] = {"__module__": __name__, **(attrs or {}), "name": name}
+    if metadata is not None:
+        namespace["metadata"] = metadata
+    if schema is not None:
+        fields = _get_fields_from_schema(schema, use_dataclass)
+        param_model = _get_param_model(params_class_name, fields, use_dataclass)
+    elif isinstance(params, type):
+        param_model = params
+    elif params is not None:
+        fields = _get_fields(params)
+        param_model = _get_param_model(params_class_name, fields, use_dataclass)
+    else:
+        return types.new_class(
+            class_name or _get_class_name(name),
+            (base,),
+            exec_body=lambda ns: ns.update(namespace),
+        )
+    # types.GenericAlias instead of Args[param_model], which would keep a
+    # reference to param_model in the cache of typing.
+    spider_cls: type[Any] = types.new_class(
+        class_name or _get_class_name(name),
+        (types.GenericAlias(Args, (param_model,)), base),
+        exec_body=lambda ns: ns.update(namespace),
+    )
+    if _profiling.PROFILER is None:
+        # Share the validator and the cached schemas of the parameters with
+        # other spider classes with the same parameters.
+        cache_size = getattr(spider_cls, "args_cache_size", 0)
+        key = (param_model, cache_size)
+        param_spec = _SHARED_PARAM_SPECS.get(key)
+        if param_spec is None:
+            param_spec = _SHARED_PARAM_SPECS[key] = _ParamSpec(param_model, cache_size)
+        _PARAM_SPECS[spider_cls] = param_spec
+    return spider_cls
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
+from ._metadata import _get_normalized_metadata
+from ._preload import get_spider_classes
+from ._utils import canonicalize_param_schema
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from scrapy import Spider
+    from scrapy.spiderloader import SpiderLoaderProtocol
+
+# Hashed with the metadata, so that changes to the way fingerprints are
+# computed change all fingerprints.
+FINGERPRINT_VERSION = 2
+
+_FINGERPRINTS: WeakKeyDictionary[type[Spider], str] = WeakKeyDictionary()
+
+
+def _get_param_order(metadata: dict[str, Any]) -> list[str]:
+    return list(metadata.get("param_schema", {}).get("properties", ()))
+
+
+def get_spider_fingerprint(spider_cls: type[Spider]) -> str:
+    """Return a fingerprint of the normalized metadata of *spider_cls*,
+    including its :ref:`parameter schema <params-schema>`, as a hexadecimal
+    SHA-256 hash.
+
+    The fingerprint only changes if the metadata returned by
+    :func:`~scrapy_spider_metadata.get_spider_metadata` with
+    ``normalize=True`` changes, or if the order of parameters changes, so it
+    can be used to invalidate cached metadata. The parameter schema is
+    hashed in :ref:`canonical order <canonical-schema>`, so that e.g. the
+    order of ``anyOf`` entries does not matter. It is computed only once per
+    spider class and process.
+
+    The metadata must be JSON-serializable.
+    """
+    try:
+        return _FINGERPRINTS[spider_cls]
+    except KeyError:
+        pass
+    metadata = _get_normalized_metadata(spider_cls)
+    if "param_schema" in metadata:
+        # In canonical order, so that e.g. the order of anyOf entries does
+        # not matter.
+        param_schema = copy.deepcopy(metadata["param_schema"])
+        canonicalize_param_schema(param_schema)
+        metadata = {**metadata, "param_schema": param_schema}
+    # Keys are sorted for a canonical representation, but the order of
+    # parameters matters to user interfaces.
+    data = json.dumps(
+        [FINGERPRINT_VERSION, metadata, _get_param_order(metadata)],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    fingerprint = _FINGERPRINTS[spider_cls] = hashlib.sha256(data.encode()).hexdigest()
+    return fingerprint
+
+
+def get_fingerprint_manifest(
+    spiders: Iterable[type[Spider]] | SpiderLoaderProtocol,
+) -> dict[str, str]:
+    """Return the :func:`fingerprint <get_spider_fingerprint>` of each of
+    *spiders*, keyed and sorted by spider name.
+
+    :param spiders: Spider classes, or a :ref:`spider loader
+        <topics-api-spiderloader>` to get the fingerprints of all the spiders
+        of a project.
+    """
+    fingerprints = {
+        spider_cls.name: get_spider_fingerprint(spider_cls)
+        for spider_cls in get_spider_classes(spiders)
+    }
+    return dict(sorted(fingerprints.items()))
@@ -1,28 +1,120 @@
-from typing import Any
+from __future__ import annotations
 
-from scrapy import Spider
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
 
+from scrapy_spider_metadata import _profiling
 from scrapy_spider_metadata._params import Args
+from scrapy_spider_metadata._utils import DEFAULT_NORMALIZATION_PASSES
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from scrapy import Spider
+
+    from scrapy_spider_metadata._utils import NormalizationPass
 
 ATTR_NAME = "metadata"
+MERGE_ATTR_NAME = "merge_metadata"
+
+_MERGED_METADATA: WeakKeyDictionary[type[Spider], dict[str, Any]] = WeakKeyDictionary()
+
+
+def _merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    result = base.copy()
+    for key, value in override.items():
+        base_value = result.get(key)
+        if isinstance(value, dict) and isinstance(base_value, dict):
+            result[key] = _merge(base_value, value)
+        else:
+            result[key] = value
+    return result
+
+
+def _get_merged_metadata(spider_cls: type[Spider]) -> dict[str, Any]:
+    """Return the ``metadata`` dicts defined along the MRO of *spider_cls*,
+    deep-merged, computed only once per spider class.
+
+    The returned dict is shared, so it must not be modified.
+    """
+    try:
+        return _MERGED_METADATA[spider_cls]
+    except KeyError:
+        pass
+    merged: dict[str, Any] = {}
+    for cls in reversed(spider_cls.__mro__):
+        metadata = vars(cls).get(ATTR_NAME)
+        if metadata:
+            merged = _merge(merged, metadata)
+    _MERGED_METADATA[spider_cls] = merged
+    return merged
 
 
 def get_spider_metadata(
-    spider_cls: type[Spider], *, normalize: bool = False
+    spider_cls: type[Spider],
+    *,
+    normalize: bool = False,
+    passes: Sequence[NormalizationPass] = DEFAULT_NORMALIZATION_PASSES,
+    canonical: bool = False,
 ) -> dict[str, Any]:
     """Return the metadata for the spider class.
 
-    Return a copy of the ``metadata`` dict. If the spider class defines
+    Return a copy of the ``metadata`` dict, or of the :ref:`merged
+    <merge-metadata>` ``metadata`` dicts of the spider class and its base
+    classes if ``merge_metadata`` is ``True``. If the spider class defines
     :ref:`spider parameters <params>`, the returned dict will have an
     additional ``param_schema`` key which value is the :ref:`JSON Schema
     <params-schema>` for the parameters.
 
     :param spider_cls: The spider class.
     :param normalize: Normalize the returned schema.
+    :param passes: :ref:`Normalization passes <normalization-passes>` to
+        apply when *normalize* is ``True``.
+    :param canonical: Sort the returned schema into a :ref:`canonical order
+        <canonical-schema>`.
     :return: The complete spider metadata.
     """
-    base_metadata = getattr(spider_cls, ATTR_NAME, {})
+    profiler = _profiling.PROFILER
+    if profiler is not None:
+        class_path = _profiling.get_class_path(spider_cls)
+        with profiler.profile(class_path, "get_spider_metadata"):
+            return _get_spider_metadata(spider_cls, normalize, passes, canonical)
+    return _get_spider_metadata(spider_cls, normalize, passes, canonical)
+
+
+def _get_spider_metadata(
+    spider_cls: type[Spider],
+    normalize: bool,
+    passes: Sequence[NormalizationPass],
+    canonical: bool,
+) -> dict[str, Any]:
+    if getattr(spider_cls, MERGE_ATTR_NAME, False):
+        base_metadata = _get_merged_metadata(spider_cls)
+    else:
+        base_metadata = getattr(spider_cls, ATTR_NAME, {})
     result = base_metadata.copy()
     if issubclass(spider_cls, Args):
-        result["param_schema"] = spider_cls.get_param_schema(normalize=normalize)
+        result["param_schema"] = spider_cls.get_param_schema(
+            normalize=normalize, passes=passes, canonical=canonical
+        )
     return result
+
+
+_NORMALIZED_METADATA: WeakKeyDictionary[type[Spider], dict[str, Any]] = (
+    WeakKeyDictionary()
+)
+
+
+def _get_normalized_metadata(spider_cls: type[Spider]) -> dict[str, Any]:
+    """Return the normalized metadata of *spider_cls*, computed only once per
+    spider class.
+
+    The returned dict is shared, so it must not be modified.
+    """
+    try:
+        return _NORMALIZED_METADATA[spider_cls]
+    except KeyError:
+        metadata = _NORMALIZED_METADATA[spider_cls] = get_spider_metadata(
+            spider_cls, normalize=True
+        )
+        return metadata
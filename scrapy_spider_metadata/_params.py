@@ -1,37 +1,588 @@
+from __future__ import annotations
+
+import copy
+import dataclasses
+from collections.abc import Mapping
+from functools import partial
 from logging import getLogger
-from typing import Any, Generic, TypeVar
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    NamedTuple,
+    TypeVar,
+    cast,
+    get_args,
+)
+from weakref import WeakKeyDictionary
+
+from . import _profiling, _schema_cache
+from ._args_cache import ArgsCache, ArgsCacheInfo, hash_args, is_cacheable
+from ._coercion import coerce_args, coerce_column, get_coercion_plan
+from ._compat import ParamDefaults, Pydantic, get_pydantic
+from ._utils import (
+    DEFAULT_NORMALIZATION_PASSES,
+    canonicalize_param_schema,
+    get_generic_param,
+    normalize_param_schema,
+)
+from ._validation import DataclassAdapter, ParamValidationError, is_plain_dataclass
 
-from pydantic import BaseModel, ValidationError
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
 
-from ._utils import get_generic_param, normalize_param_schema
+    from ._utils import NormalizationPass
 
-ParamSpecT = TypeVar("ParamSpecT", bound=BaseModel)
+ParamSpecT = TypeVar("ParamSpecT")
 logger = getLogger(__name__)
 
 
+def _get_type_adapter(param_model: Any, pydantic: Pydantic) -> Any:
+    if not pydantic.v2:
+        raise TypeError(
+            f"{param_model!r} is not a subclass of pydantic.BaseModel or a "
+            f"dataclass, which is required with Pydantic 1.x."
+        )
+    from typing_extensions import is_typeddict
+
+    # pydantic.dataclasses.is_pydantic_dataclass() requires Pydantic 2.1+.
+    is_pydantic_dataclass = dataclasses.is_dataclass(param_model) and hasattr(
+        param_model, "__pydantic_decorators__"
+    )
+    if not (is_pydantic_dataclass or is_typeddict(param_model)):
+        raise TypeError(
+            f"{param_model!r} is not a subclass of pydantic.BaseModel, a "
+            f"dataclass or a TypedDict."
+        )
+    return pydantic.TypeAdapter(param_model)
+
+
+def _get_arg_names(param_model: Any) -> frozenset[str]:
+    if is_plain_dataclass(param_model):
+        return frozenset(
+            field.name for field in dataclasses.fields(param_model) if field.init
+        )
+    if hasattr(param_model, "__pydantic_decorators__"):
+        fields = getattr(param_model, "model_fields", None)
+        if fields is None:
+            # pydantic dataclass
+            fields = param_model.__pydantic_fields__
+        return frozenset(
+            arg_name
+            for name, field in fields.items()
+            for arg_name in (name, field.alias, field.validation_alias)
+            if isinstance(arg_name, str)
+        )
+    if hasattr(param_model, "__fields__"):  # pydantic 1.x
+        return frozenset(
+            arg_name
+            for field in param_model.__fields__.values()
+            for arg_name in (field.name, field.alias)
+        )
+    return frozenset(param_model.__annotations__)
+
+
+def _has_validators(param_model: Any) -> bool:
+    """Return ``True`` if validating *param_model* with Pydantic 2.x runs
+    validator functions, of the model, of nested models or of annotated
+    types, which must not run twice for the same arguments.
+    """
+    from pydantic.functional_validators import (
+        AfterValidator,
+        BeforeValidator,
+        PlainValidator,
+        WrapValidator,
+    )
+
+    validator_types = (AfterValidator, BeforeValidator, PlainValidator, WrapValidator)
+    seen: set[int] = set()
+    stack = [param_model]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, validator_types):
+            return True
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        decorators = getattr(item, "__pydantic_decorators__", None)
+        if decorators is not None and (
+            decorators.validators
+            or decorators.field_validators
+            or decorators.root_validators
+            or decorators.model_validators
+        ):
+            return True
+        if isinstance(item, type):
+            fields = getattr(item, "model_fields", None)
+            if fields is None:
+                # pydantic dataclass
+                fields = getattr(item, "__pydantic_fields__", None)
+            if fields is not None:
+                for field in fields.values():
+                    stack.append(field.annotation)
+                    stack.extend(field.metadata)
+            else:  # plain dataclass or TypedDict
+                stack.extend(getattr(item, "__annotations__", {}).values())
+        stack.extend(get_args(item))
+    return False
+
+
+class ArgsValidationResult(NamedTuple):
+    """Result of validating a set of arguments with
+    :meth:`Args.validate_args_batch`.
+    """
+
+    #: Validated arguments, or ``None`` if the arguments are not valid.
+    args: Any
+    #: ``None`` if the arguments are valid, or validation errors as returned
+    #: by :meth:`pydantic.ValidationError.errors`, with locations relative to
+    #: the set of arguments.
+    errors: list[dict[str, Any]] | None
+
+
+class _ParamSpec:
+    """Validation and schema generation for a :ref:`spider parameter
+    specification <define-params>` class, built once per spider class.
+    """
+
+    def __init__(self, param_model: type[Any], cache_size: int = 0):
+        self.param_model = param_model
+        self.adapter: Any
+        # Exception raised for invalid arguments.
+        self.validation_error: Any
+        # Whether many argument sets can be validated with a single call, which
+        # may validate some of them twice.
+        self._batchable = False
+        if is_plain_dataclass(param_model):
+            # Does not import Pydantic.
+            self.adapter = DataclassAdapter(param_model)
+            self.validation_error = ParamValidationError
+        else:
+            pydantic = get_pydantic()
+            self.validation_error = pydantic.ValidationError
+            self._batchable = pydantic.v2 and not _has_validators(param_model)
+            if isinstance(param_model, type) and issubclass(
+                param_model, pydantic.BaseModel
+            ):
+                self.adapter = None
+            else:
+                self.adapter = _get_type_adapter(param_model, pydantic)
+        # Bound once, so that serialization and schema generation do not
+        # depend on the type of parameter specification or on the Pydantic
+        # version.
+        self._dump: Callable[[Any], Any]
+        self._json_schema: Callable[[], dict[str, Any]]
+        if self.adapter is None:
+            self._dump = pydantic.model_dump
+            self._json_schema = partial(pydantic.model_json_schema, param_model)
+        else:
+            self._dump = partial(self.adapter.dump_python, mode="json")
+            self._json_schema = self.adapter.json_schema
+        self._get_param_defaults: Callable[[], ParamDefaults]
+        if isinstance(self.adapter, DataclassAdapter):
+            self._get_param_defaults = self.adapter.get_defaults
+        else:
+            self._get_param_defaults = partial(pydantic.param_defaults, param_model)
+        self._param_defaults: ParamDefaults | None = None
+        self.plan = get_coercion_plan(param_model)
+        self.arg_names = _get_arg_names(param_model)
+        self.cache = (
+            ArgsCache(cache_size)
+            if cache_size > 0 and is_cacheable(param_model, self.adapter)
+            else None
+        )
+        self._schema: dict[str, Any] | None = None
+        self._normalized_schema: dict[str, Any] | None = None
+        self._canonical_schema: dict[str, Any] | None = None
+        self._batch_adapter: Any = None
+        # Key of the schemas in the shared schema cache, if used.
+        self.schema_cache_key: bytes | None = None
+
+    def get_args(self, kwargs: dict[str, Any]) -> Any:
+        """Return *kwargs* validated, from the cache if possible."""
+        if self.cache is None:
+            return self.validate(kwargs)
+        key = hash_args(kwargs)
+        if key is None:
+            return self.validate(kwargs)
+        try:
+            return self.cache.get(key)
+        except KeyError:
+            pass
+        args = self.validate(kwargs)
+        self.cache.set(key, args)
+        return args
+
+    def validate(self, kwargs: dict[str, Any]) -> Any:
+        if self.plan is not None:
+            kwargs = self.coerce(kwargs)
+        return self.validate_coerced(kwargs)
+
+    def coerce(self, kwargs: Mapping[str, Any]) -> dict[str, Any]:
+        assert self.plan is not None
+        return coerce_args(self.plan, kwargs)
+
+    def validate_coerced(self, kwargs: dict[str, Any]) -> Any:
+        if self.adapter is not None:
+            return self.adapter.validate_python(kwargs)
+        return self.param_model(**kwargs)
+
+    def coerce_columns(
+        self, columns: Mapping[str, Iterable[Any]]
+    ) -> list[dict[str, Any]]:
+        """Return *columns* of arguments as rows, with list parameters
+        converted column by column.
+        """
+        coerced = {}
+        for key, values in columns.items():
+            coercer = None if self.plan is None else self.plan.get(key)
+            coerced[key] = (
+                list(values) if coercer is None else coerce_column(coercer, values)
+            )
+        lengths = {len(values) for values in coerced.values()}
+        if len(lengths) > 1:
+            raise ValueError("All argument columns must have the same length")
+        keys = list(coerced)
+        return [dict(zip(keys, row)) for row in zip(*coerced.values())]
+
+    def validate_batch(self, rows: list[dict[str, Any]]) -> list[ArgsValidationResult]:
+        """Validate already coerced *rows* of arguments.
+
+        With Pydantic 2.x, all rows are validated with a single call into
+        pydantic-core. If some rows are invalid, the valid rows are validated
+        again to get their values, as Pydantic does not return partial
+        results. Models with validators are validated row by row instead, so
+        that their validators run only once per row.
+        """
+        if not self._batchable:  # pydantic 1.x, plain dataclass or validators
+            return [self._validate_row(row) for row in rows]
+        if self._batch_adapter is None:
+            param_model: Any = self.param_model
+            self._batch_adapter = get_pydantic().TypeAdapter(list[param_model])
+        try:
+            values = self._batch_adapter.validate_python(rows)
+        except self.validation_error as e:
+            errors_by_row: dict[int, list[dict[str, Any]]] = {}
+            for error in e.errors():
+                index = cast("int", error["loc"][0])
+                errors_by_row.setdefault(index, []).append(
+                    {**error, "loc": error["loc"][1:]}
+                )
+        else:
+            return [ArgsValidationResult(args, None) for args in values]
+        valid_indexes = [i for i in range(len(rows)) if i not in errors_by_row]
+        valid_values = iter(
+            self._batch_adapter.validate_python([rows[i] for i in valid_indexes])
+        )
+        return [
+            ArgsValidationResult(None, errors_by_row[i])
+            if i in errors_by_row
+            else ArgsValidationResult(next(valid_values), None)
+            for i in range(len(rows))
+        ]
+
+    def _validate_row(self, row: dict[str, Any]) -> ArgsValidationResult:
+        try:
+            args = self.validate_coerced(row)
+        except self.validation_error as e:
+            return ArgsValidationResult(None, [dict(error) for error in e.errors()])
+        return ArgsValidationResult(args, None)
+
+    def dump(self, args: Any) -> Any:
+        """Return *args* as JSON-serializable data."""
+        return self._dump(args)
+
+    def json_schema(self) -> dict[str, Any]:
+        return self._json_schema()
+
+    def get_defaults(self) -> dict[str, Any]:
+        """Return the default values of the optional parameters and the
+        names of the required parameters.
+
+        Fields are inspected only once, but default factories are called
+        every time, since they may return a different value every time.
+        """
+        if self._param_defaults is None:
+            self._param_defaults = self._get_param_defaults()
+        get_defaults, required = self._param_defaults
+        return {"defaults": get_defaults(), "required": list(required)}
+
+    def get_schema(
+        self,
+        normalize: bool,
+        passes: Sequence[NormalizationPass],
+        canonical: bool = False,
+    ) -> dict[str, Any]:
+        """Return a copy of the JSON Schema of the parameters.
+
+        The schema and its normalized version with the default passes, in
+        canonical order or not, are generated only once, since generating them
+        is much slower than copying them.
+        """
+        if self._schema is None:
+            self._load_schemas()
+            assert self._schema is not None
+        if not normalize:
+            schema = copy.deepcopy(self._schema)
+            if canonical:
+                canonicalize_param_schema(schema)
+            return schema
+        if tuple(passes) != DEFAULT_NORMALIZATION_PASSES:
+            schema = copy.deepcopy(self._schema)
+            self.normalize(schema, passes, canonical=canonical)
+            return schema
+        if self._normalized_schema is None:
+            self._normalized_schema = copy.deepcopy(self._schema)
+            self.normalize(self._normalized_schema, DEFAULT_NORMALIZATION_PASSES)
+        if not canonical:
+            return copy.deepcopy(self._normalized_schema)
+        if self._canonical_schema is None:
+            self._canonical_schema = copy.deepcopy(self._normalized_schema)
+            canonicalize_param_schema(self._canonical_schema)
+        return copy.deepcopy(self._canonical_schema)
+
+    def _load_schemas(self) -> None:
+        """Set the raw schema, from the shared schema cache if possible.
+
+        On a cache miss, the normalized schema is also generated, to store
+        both in the cache at once.
+        """
+        cache = _schema_cache.SCHEMA_CACHE
+        key = self.schema_cache_key
+        if cache is None or key is None:
+            self._schema = self.json_schema()
+            return
+        schemas = cache.get(key)
+        if schemas is not None:
+            self._schema, self._normalized_schema = schemas
+            return
+        self._schema = self.json_schema()
+        self._normalized_schema = copy.deepcopy(self._schema)
+        self.normalize(self._normalized_schema, DEFAULT_NORMALIZATION_PASSES)
+        cache.set(key, [self._schema, self._normalized_schema])
+
+    def normalize(
+        self,
+        schema: dict[str, Any],
+        passes: Sequence[NormalizationPass],
+        canonical: bool = False,
+    ) -> None:
+        normalize_param_schema(schema, passes=passes, canonical=canonical)
+
+
+class _ProfiledParamSpec(_ParamSpec):
+    """:class:`_ParamSpec` that records the time spent on each stage, used
+    instead of it when :mod:`profiling <._profiling>` is enabled.
+    """
+
+    def __init__(
+        self,
+        param_model: type[Any],
+        cache_size: int = 0,
+        *,
+        profiler: _profiling.Profiler,
+        spider_cls: str,
+    ):
+        self._profiler = profiler
+        self._spider_cls = spider_cls
+        with profiler.profile(spider_cls, "build_param_spec"):
+            super().__init__(param_model, cache_size)
+
+    def get_args(self, kwargs: dict[str, Any]) -> Any:
+        with self._profiler.profile(self._spider_cls, "get_args"):
+            return super().get_args(kwargs)
+
+    def coerce(self, kwargs: Mapping[str, Any]) -> dict[str, Any]:
+        with self._profiler.profile(self._spider_cls, "coerce_args"):
+            return super().coerce(kwargs)
+
+    def validate_coerced(self, kwargs: dict[str, Any]) -> Any:
+        with self._profiler.profile(self._spider_cls, "validate_args"):
+            return super().validate_coerced(kwargs)
+
+    def validate_batch(self, rows: list[dict[str, Any]]) -> list[ArgsValidationResult]:
+        with self._profiler.profile(self._spider_cls, "validate_args_batch"):
+            return super().validate_batch(rows)
+
+    def json_schema(self) -> dict[str, Any]:
+        with self._profiler.profile(self._spider_cls, "json_schema"):
+            return super().json_schema()
+
+    def get_schema(
+        self,
+        normalize: bool,
+        passes: Sequence[NormalizationPass],
+        canonical: bool = False,
+    ) -> dict[str, Any]:
+        with self._profiler.profile(self._spider_cls, "get_param_schema"):
+            return super().get_schema(normalize, passes, canonical)
+
+    def normalize(
+        self,
+        schema: dict[str, Any],
+        passes: Sequence[NormalizationPass],
+        canonical: bool = False,
+    ) -> None:
+        with self._profiler.profile(self._spider_cls, "normalize_param_schema"):
+            super().normalize(schema, passes, canonical)
+
+
+_PARAM_SPECS: WeakKeyDictionary[type, _ParamSpec] = WeakKeyDictionary()
+
+
+def _get_param_spec(spider_cls: type) -> _ParamSpec:
+    try:
+        return _PARAM_SPECS[spider_cls]
+    except KeyError:
+        pass
+    cache_size = getattr(spider_cls, "args_cache_size", 0)
+    profiler = _profiling.PROFILER
+    if profiler is None:
+        param_model = get_generic_param(spider_cls, Args)
+        assert param_model is not None
+        param_spec = _ParamSpec(param_model, cache_size)
+    else:
+        class_path = _profiling.get_class_path(spider_cls)
+        with profiler.profile(class_path, "get_generic_param"):
+            param_model = get_generic_param(spider_cls, Args)
+        assert param_model is not None
+        param_spec = _ProfiledParamSpec(
+            param_model, cache_size, profiler=profiler, spider_cls=class_path
+        )
+    if _schema_cache.SCHEMA_CACHE is not None:
+        param_spec.schema_cache_key = _schema_cache.get_cache_key(
+            spider_cls, param_model
+        )
+    _PARAM_SPECS[spider_cls] = param_spec
+    return param_spec
+
+
 class Args(Generic[ParamSpecT]):
     """Validates and type-converts :ref:`spider arguments <spiderargs>` into
     the :attr:`args` instance attribute according to the :ref:`spider parameter
     specification <define-params>`.
     """
 
+    #: Whether arguments for :ref:`defined parameters <define-params>` are
+    #: also set as spider attributes in their original form, as Scrapy does
+    #: for any :ref:`spider argument <spiderargs>`.
+    #:
+    #: Set to ``False`` in your spider class to keep those arguments only in
+    #: :attr:`args`, e.g. to avoid keeping large arguments in memory twice.
+    raw_args_as_attributes: bool = True
+
+    #: Maximum number of validated :attr:`args` to keep in memory, per spider
+    #: class, to reuse a copy of them when the spider is instantiated again
+    #: with the same arguments, e.g. in a process that runs the same job
+    #: many times.
+    #:
+    #: When the cache is full, the least recently used entry is evicted.
+    #:
+    #: The cache is not used if your parameter specification class defines
+    #: validators, default factories or post-init hooks, or uses custom types
+    #: that define validators, e.g. :class:`~scrapy_spider_metadata.FileLines`.
+    #: It only pays off if validation is more expensive than copying, e.g.
+    #: for large arguments or for many nested models; see
+    #: :meth:`get_args_cache_info`.
+    args_cache_size: int = 0
+
     def __init__(self, *args: Any, **kwargs: Any):
-        param_model = get_generic_param(self.__class__, Args)
-        #: :ref:`Spider arguments <spiderargs>` parsed according to the
-        #: :ref:`spider parameter specification <define-params>`.
-        assert param_model is not None
+        param_spec = _get_param_spec(self.__class__)
+        start_time = perf_counter()
         try:
-            self.args: ParamSpecT = param_model(**kwargs)
-        except ValidationError as e:
+            #: :ref:`Spider arguments <spiderargs>` parsed according to the
+            #: :ref:`spider parameter specification <define-params>`.
+            self.args: ParamSpecT = param_spec.get_args(kwargs)
+        except param_spec.validation_error as e:
             # Log the message explicitly, when using the “scrapy crawl” command
             # the exception seems to be silenced somehow instead of showing up
             # in the command output otherwise.
             logger.error(f"Spider parameter validation failed: {e}")
             raise
+        self._args_validation_time = perf_counter() - start_time
+        if not self.raw_args_as_attributes:
+            kwargs = {
+                key: value
+                for key, value in kwargs.items()
+                if key not in param_spec.arg_names
+            }
         super().__init__(*args, **kwargs)
 
     @classmethod
-    def get_param_schema(cls, normalize: bool = False) -> dict[Any, Any]:
+    def validate_args_batch(
+        cls,
+        args: Mapping[str, Iterable[Any]] | Iterable[Mapping[str, Any]],
+    ) -> list[ArgsValidationResult]:
+        """Validate many sets of :ref:`spider arguments <spiderargs>` at once,
+        e.g. all the combinations of a parameter sweep, without creating any
+        spider.
+
+        *args* can be a dict of argument columns, e.g. ``{"pages": ["1",
+        "2"], "query": ["a", "b"]}``, or an iterable of argument dicts, e.g.
+        ``[{"pages": "1", "query": "a"}, {"pages": "2", "query": "b"}]``.
+
+        Return an :class:`ArgsValidationResult` per set of arguments, in
+        order. This is faster than validating each set of arguments
+        separately; see :ref:`batch-validation`.
+        """
+        param_spec = _get_param_spec(cls)
+        if isinstance(args, Mapping):
+            rows = param_spec.coerce_columns(args)
+        elif param_spec.plan is None:
+            rows = [dict(row) for row in args]
+        else:
+            rows = [param_spec.coerce(row) for row in args]
+        return param_spec.validate_batch(rows)
+
+    @classmethod
+    def get_args_cache_info(cls) -> ArgsCacheInfo | None:
+        """Return statistics of the :attr:`args_cache_size` cache of the
+        spider class, or ``None`` if the cache is not used.
+        """
+        cache = _get_param_spec(cls).cache
+        return None if cache is None else cache.info()
+
+    @classmethod
+    def get_param_defaults(cls) -> dict[str, Any]:
+        """Return the default arguments of the spider class, without creating
+        any spider.
+
+        Return a dict with a ``defaults`` key, which value is a dict of
+        default values of optional parameters, with default factories called,
+        and a ``required`` key, which value is a list of names of required
+        parameters. Both use the parameter names and order of the
+        :ref:`parameter schema <params-schema>`, and values are
+        JSON-serializable, e.g. enum members are replaced by their values.
+        Parameters which default factory needs the value of a required
+        parameter are in neither, since their default value is only known
+        once arguments are passed.
+
+        .. code-block:: python
+
+            class MyParams(BaseModel):
+                pages: int
+                query: str = "books"
+
+
+            class MySpider(Args[MyParams], Spider):
+                name = "my_spider"
+
+
+            MySpider.get_param_defaults()
+            # {'defaults': {'query': 'books'}, 'required': ['pages']}
+        """
+        return _get_param_spec(cls).get_defaults()
+
+    @classmethod
+    def get_param_schema(
+        cls,
+        normalize: bool = False,
+        *,
+        passes: Sequence[NormalizationPass] = DEFAULT_NORMALIZATION_PASSES,
+        canonical: bool = False,
+    ) -> dict[Any, Any]:
         """Return a :class:`dict` with the :ref:`parameter definition
         <define-params>` as `JSON Schema`_.
 
@@ -41,14 +592,11 @@ class Args(Generic[ParamSpecT]):
         regardless of whether you are using Pydantic 1.x or Pydantic 2.x. The
         normalized schema may not match the output of any Pydantic version, but
         it will be functionally equivalent where possible.
+
+        *passes* are the :ref:`normalization passes <normalization-passes>` to
+        apply when *normalize* is ``True``.
+
+        If *canonical* is ``True``, the returned schema is sorted into a
+        :ref:`canonical order <canonical-schema>`.
         """
-        param_model = get_generic_param(cls, Args)
-        assert param_model is not None
-        assert issubclass(param_model, BaseModel)
-        try:
-            param_schema = param_model.model_json_schema()
-        except AttributeError:  # pydantic 1.x
-            param_schema = param_model.schema()
-        if normalize:
-            normalize_param_schema(param_schema)
-        return param_schema
+        return _get_param_spec(cls).get_schema(normalize, passes, canonical)
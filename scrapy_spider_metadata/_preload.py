@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from ._metadata import _get_normalized_metadata
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from scrapy import Spider
+    from scrapy.settings import BaseSettings
+    from scrapy.spiderloader import SpiderLoaderProtocol
+
+
+def get_spider_loader(settings: BaseSettings) -> SpiderLoaderProtocol:
+    """Return the spider loader of a project with the given *settings*."""
+    try:
+        from scrapy.spiderloader import get_spider_loader
+    except ImportError:  # Scrapy < 2.13
+        from scrapy.utils.misc import load_object
+
+        loader_cls = load_object(settings["SPIDER_LOADER_CLASS"])
+        return loader_cls.from_settings(settings.frozencopy())  # type: ignore[no-any-return]
+    return get_spider_loader(settings)
+
+
+def get_spider_classes(
+    spiders: Iterable[type[Spider]] | SpiderLoaderProtocol,
+) -> list[type[Spider]]:
+    """Return *spiders*, or all the spider classes of a spider loader."""
+    if hasattr(spiders, "list") and hasattr(spiders, "load"):
+        return [spiders.load(name) for name in spiders.list()]
+    return list(spiders)
+
+
+def preload(
+    spiders: Iterable[type[Spider]] | SpiderLoaderProtocol,
+) -> dict[type[Spider], float]:
+    """Pay the one-time costs of :ref:`spider parameters <params>` and
+    :ref:`metadata <metadata>` of *spiders* in advance.
+
+    For each spider class, resolve its parameter specification class, build
+    its validator and generate its normalized metadata, all of which are
+    otherwise computed the first time that each spider runs or that its
+    metadata is requested.
+
+    :param spiders: Spider classes, or a :ref:`spider loader
+        <topics-api-spiderloader>` to preload all the spiders of a project.
+    :return: The time, in seconds, spent on each spider class.
+    """
+    timings = {}
+    for spider_cls in get_spider_classes(spiders):
+        start_time = perf_counter()
+        _get_normalized_metadata(spider_cls)
+        timings[spider_cls] = perf_counter() - start_time
+    return timings
@@ -0,0 +1,86 @@
+"""Opt-in profiling of spider parameter and metadata handling.
+
+Set the ``SCRAPY_SPIDER_METADATA_PROFILE`` environment variable to ``1`` to
+record the time spent on, and the number of calls to, each stage of
+:class:`~scrapy_spider_metadata.Args` and
+:func:`~scrapy_spider_metadata.get_spider_metadata`, per spider class, and to
+print a report to the standard error on process exit.
+
+When profiling is disabled, :data:`PROFILER` is ``None`` and profiled code
+paths are not used at all, so there is no overhead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+ENV_VAR = "SCRAPY_SPIDER_METADATA_PROFILE"
+
+
+def get_class_path(cls: type, /) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+class Profiler:
+    """Timings and call counts of profiled stages, per spider class."""
+
+    def __init__(self) -> None:
+        # Keyed by class import path, instead of by class, so that entries
+        # do not keep classes alive, and survive them for the exit report.
+        self._stages: dict[str, dict[str, list[Any]]] = {}
+
+    def add(self, spider_cls: str, stage: str, seconds: float) -> None:
+        stages = self._stages.setdefault(spider_cls, {})
+        try:
+            entry = stages[stage]
+        except KeyError:
+            stages[stage] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    @contextmanager
+    def profile(self, spider_cls: str, stage: str) -> Iterator[None]:
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(spider_cls, stage, perf_counter() - start_time)
+
+    def get_stats(self, spider_cls: type, /) -> dict[str, dict[str, Any]]:
+        """Return ``{stage: {"count": ..., "time": ...}}`` for
+        *spider_cls*.
+        """
+        stages = self._stages.get(get_class_path(spider_cls), {})
+        return {
+            stage: {"count": count, "time": seconds}
+            for stage, (count, seconds) in stages.items()
+        }
+
+    def report(self) -> str:
+        lines = ["scrapy-spider-metadata profile (calls, total seconds):"]
+        for spider_cls, stages in sorted(self._stages.items()):
+            lines.append(spider_cls)
+            lines.extend(
+                f"  {stage:<24}{count:>8}{seconds:>14.6f}"
+                for stage, (count, seconds) in stages.items()
+            )
+        return "\n".join(lines)
+
+
+def _print_report(profiler: Profiler) -> None:
+    print(profiler.report(), file=sys.stderr)
+
+
+PROFILER: Profiler | None = None
+if os.environ.get(ENV_VAR, "0").lower() not in ("", "0", "false"):
+    PROFILER = Profiler()
+    atexit.register(_print_report, PROFILER)
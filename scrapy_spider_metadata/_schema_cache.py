@@ -0,0 +1,281 @@
+"""Opt-in cache of parameter schemas shared by processes through a file.
+
+Set the ``SCRAPY_SPIDER_METADATA_SCHEMA_CACHE`` environment variable to the
+path of a file to store the JSON Schema of the parameters of each spider
+class, raw and normalized, the first time that any process generates it, and
+to read it from that file in other processes instead of generating it again.
+
+The file is never modified in place. Writers build a new file next to it and
+atomically replace the old one, holding a lock only against other writers.
+Readers memory-map the current file and look up entries without locking; a
+file replaced while mapped stays valid until it is unmapped.
+
+File layout, little-endian:
+
+-   Header: magic, format version, number of entries.
+
+-   Index: per entry, sorted by key, the key (two SHA-256 digests), and the
+    offset and length of its value.
+
+-   Values: JSON.
+
+Keys are the digest of the import path of the spider class followed by the
+digest of a token of the code that defines its schema: the path, modification
+time and size of the source files of the spider class, of the parameter
+specification class and of their base classes, and the Pydantic version.
+Storing the schemas of a spider class drops those stored for previous versions
+of its code, so that the file does not grow with every code change. Spider
+classes that cannot be imported from their import path, e.g. classes defined in
+functions or created at run time, are not cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ._validation import is_plain_dataclass
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+ENV_VAR = "SCRAPY_SPIDER_METADATA_SCHEMA_CACHE"
+# Part of every key, so that changes to cached values invalidate all entries.
+CACHE_VERSION = 1
+
+_MAGIC = b"SSMC"
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sII")
+# Size of the part of keys shared by the versions of an entry.
+_GROUP_SIZE = 32
+_ENTRY = struct.Struct("<64sQI")
+# Modules whose code changes the generated schemas.
+_OWN_MODULES = ("_params", "_types", "_utils", "_validation")
+
+logger = getLogger(__name__)
+
+
+def _is_importable(cls: type) -> bool:
+    obj: Any = sys.modules.get(cls.__module__)
+    for name in cls.__qualname__.split("."):
+        obj = getattr(obj, name, None)
+    return obj is cls
+
+
+def _get_source_files(param_model: type, spider_cls: type) -> list[str]:
+    modules = {base.__module__ for base in spider_cls.__mro__}
+    modules.update(base.__module__ for base in param_model.__mro__)
+    modules.update(f"{__package__}.{name}" for name in _OWN_MODULES)
+    files = (getattr(sys.modules.get(module), "__file__", None) for module in modules)
+    return sorted({file for file in files if file})
+
+
+def get_cache_key(spider_cls: type, param_model: Any) -> bytes | None:
+    """Return the key of the schemas of *spider_cls* in the cache, or
+    ``None`` if they cannot be cached.
+    """
+    if not isinstance(param_model, type) or not _is_importable(spider_cls):
+        return None
+    try:
+        sources = [
+            [file, stat.st_mtime_ns, stat.st_size]
+            for file in _get_source_files(param_model, spider_cls)
+            for stat in (Path(file).stat(),)
+        ]
+    except OSError:
+        return None
+    pydantic_version = (
+        None
+        if is_plain_dataclass(param_model)
+        else getattr(sys.modules.get("pydantic"), "VERSION", None)
+    )
+    class_path = f"{spider_cls.__module__}.{spider_cls.__qualname__}"
+    data = json.dumps([CACHE_VERSION, class_path, pydantic_version, sources])
+    return (
+        hashlib.sha256(class_path.encode()).digest()
+        + hashlib.sha256(data.encode()).digest()
+    )
+
+
+def _get_file_id(stat: os.stat_result) -> tuple[int, ...]:
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class SchemaCacheFile:
+    """Cache of JSON-serializable values in a file shared by processes.
+
+    Keys are 64 bytes long. Their first 32 bytes identify a group of
+    entries, e.g. the versions of the schemas of a spider class, of which only
+    the last one stored is kept.
+
+    Entries that point outside of the file or that are not valid JSON, e.g.
+    in a truncated file, are treated as missing, and are dropped the next
+    time that the file is written.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path)
+        self._map: mmap.mmap | None = None
+        self._count = 0
+        # Identity of the mapped file, to detect that it has been replaced.
+        self._file_id: tuple[int, ...] | None = None
+
+    def _refresh(self) -> None:
+        """Map the current version of the file, if not mapped yet."""
+        try:
+            file_id = _get_file_id(self.path.stat())
+        except OSError:
+            self._close()
+            return
+        if file_id == self._file_id:
+            return
+        self._close()
+        try:
+            with self.path.open("rb") as f:
+                stat = os.fstat(f.fileno())
+                self._file_id = _get_file_id(stat)
+                if stat.st_size < _HEADER.size:
+                    return
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return
+        magic, version, count = _HEADER.unpack_from(data)
+        if (
+            magic != _MAGIC
+            or version != _FORMAT_VERSION
+            or len(data) < _HEADER.size + count * _ENTRY.size
+        ):
+            data.close()
+            return
+        self._map = data
+        self._count = count
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._count = 0
+        self._file_id = None
+
+    def _entry(self, index: int) -> tuple[bytes, bytes | None]:
+        """Return the key and the value of the entry at *index*, with
+        ``None`` as value if it points outside of the file.
+        """
+        assert self._map is not None
+        key, offset, length = _ENTRY.unpack_from(
+            self._map, _HEADER.size + index * _ENTRY.size
+        )
+        if offset < _HEADER.size + self._count * _ENTRY.size or (
+            offset + length > len(self._map)
+        ):
+            return key, None
+        return key, self._map[offset : offset + length]
+
+    def _find(self, key: bytes) -> bytes | None:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, value = self._entry(middle)
+            if entry_key == key:
+                return value
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, key: bytes) -> Any:
+        """Return the value stored for *key*, or ``None``."""
+        self._refresh()
+        data = self._find(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:  # corrupt entry
+            return None
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Lock the file against other writers."""
+        if fcntl is None:
+            yield
+            return
+        with self.path.with_name(f"{self.path.name}.lock").open("a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _iter_valid_entries(self) -> Iterator[tuple[bytes, bytes]]:
+        """Yield the key and value of the entries of the mapped file that
+        point inside the file and are valid JSON.
+        """
+        for index in range(self._count):
+            key, value = self._entry(index)
+            if value is None:
+                continue
+            try:
+                json.loads(value)
+            except ValueError:
+                continue
+            yield key, value
+
+    def set(self, key: bytes, value: Any) -> None:
+        """Store *value* for *key*, replacing the entries of the same group.
+
+        Errors writing the file are logged and otherwise ignored, since the
+        value can always be computed again.
+        """
+        try:
+            data = json.dumps(value, separators=(",", ":")).encode()
+        except (TypeError, ValueError):  # not JSON-serializable
+            return
+        try:
+            with self._lock():
+                self._refresh()
+                group = key[:_GROUP_SIZE]
+                entries = {
+                    entry_key: entry_value
+                    for entry_key, entry_value in self._iter_valid_entries()
+                    if entry_key[:_GROUP_SIZE] != group
+                }
+                entries[key] = data
+                self._write(entries)
+        except OSError as e:
+            logger.warning(f"Could not write the schema cache {str(self.path)!r}: {e}")
+
+    def _write(self, entries: dict[bytes, bytes]) -> None:
+        keys = sorted(entries)
+        offset = _HEADER.size + len(keys) * _ENTRY.size
+        index = []
+        for key in keys:
+            index.append(_ENTRY.pack(key, offset, len(entries[key])))
+            offset += len(entries[key])
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with temp_path.open("wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(keys)))
+                f.writelines(index)
+                f.writelines(entries[key] for key in keys)
+                f.flush()
+                os.fsync(f.fileno())
+            temp_path.replace(self.path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+
+SCHEMA_CACHE: SchemaCacheFile | None = None
+if os.environ.get(ENV_VAR):
+    SCHEMA_CACHE = SchemaCacheFile(os.environ[ENV_VAR])
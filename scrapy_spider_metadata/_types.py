@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from ._compat import get_pydantic
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterator
+
+
+class _Pydantic1ClassMethod:
+    """Class method that only exists with Pydantic 1.x.
+
+    Pydantic 2.0-2.2 refuse types that define some Pydantic 1.x hooks, e.g.
+    ``__modify_schema__``, so the attribute is hidden from them. Pydantic is
+    only imported when the attribute is looked up.
+    """
+
+    def __init__(self, func: Callable[..., Any]):
+        self.func = func
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if get_pydantic().v2:
+            raise AttributeError(self.name)
+        return self.func.__get__(owner, type(owner))
+
+
+class FileLines:
+    """:ref:`Spider parameter <define-params>` type for the path to a local
+    text file, e.g. a list of URLs, that is read line by line on iteration.
+
+    Only the path is kept in memory, so large inputs do not increase the
+    memory usage of the spider. The file must exist when the spider arguments
+    are validated. Leading and trailing whitespace is stripped from lines, and
+    empty lines are skipped.
+
+    .. code-block:: python
+
+        from pydantic import BaseModel
+        from scrapy import Request, Spider
+        from scrapy_spider_metadata import Args, FileLines
+
+        class MyParams(BaseModel):
+            urls: FileLines
+
+        class MySpider(Args[MyParams], Spider):
+            name = "my_spider"
+
+            def start_requests(self):
+                for url in self.args.urls:
+                    yield Request(url)
+
+    In the JSON Schema of the parameters, the parameter is a string.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], /):
+        #: Path to the file.
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise ValueError(f"{str(path)!r} is not a file")
+
+    def __iter__(self) -> Iterator[str]:
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                stripped = line.strip()
+                if stripped:
+                    yield stripped
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FileLines):
+            return NotImplemented
+        return self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self.path)!r})"
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    @classmethod
+    def _validate(cls, value: Any) -> FileLines:
+        if isinstance(value, cls):
+            return value
+        if not isinstance(value, (str, Path)):
+            raise TypeError("string required")
+        return cls(value)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        from pydantic_core import core_schema
+
+        return core_schema.no_info_after_validator_function(
+            cls._validate,
+            core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), core_schema.str_schema()]
+            ),
+            serialization=core_schema.to_string_ser_schema(),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, core_schema: Any, handler: Any) -> Any:
+        return {"type": "string"}
+
+    # pydantic 1.x
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[[Any], FileLines]]:
+        yield cls._validate
+
+    # pydantic 1.x
+    @_Pydantic1ClassMethod
+    def __modify_schema__(cls, field_schema: dict[str, Any]) -> None:
+        field_schema.update(type="string")
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import copy
+import json
 from collections import deque
-from typing import Any, TypeVar, cast, get_args
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, cast, get_args
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
 
 
 def get_generic_param(cls: type, expected: type | tuple[type, ...]) -> type | None:
@@ -25,57 +29,498 @@ def get_generic_param(cls: type, expected: type | tuple[type, ...]) -> type | No
     return None
 
 
-def _normalize_param(key: str, value: dict[str, Any], defs: dict[str, Any], /) -> None:
-    def get_def(ref: str) -> dict[str, Any]:
-        def_id = ref.rsplit("/", maxsplit=1)[1]
-        return cast(dict[str, Any], defs[def_id])
+def _iter_refs(value: Any, /) -> Iterator[str]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "$ref" and isinstance(item, str):
+                yield item
+            else:
+                yield from _iter_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_refs(item)
+
+
+def _get_def_id(ref: str, /) -> str:
+    return ref.rsplit("/", maxsplit=1)[1]
+
+
+def _find_recursive_defs(graph: dict[str, set[str]], /) -> set[str]:
+    """Return the nodes of *graph* that are part of a cycle.
+
+    Uses an iterative version of Tarjan's strongly connected components
+    algorithm, so that deeply nested definitions do not hit the recursion
+    limit.
+    """
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    result: set[str] = set()
+    for root, root_children in graph.items():
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(root_children))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in graph:
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] != index[node]:
+                    continue
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in graph[node]:
+                    result.update(component)
+    return result
+
+
+class NormalizationContext:
+    """Schema-wide data available to :ref:`normalization passes
+    <normalization-passes>`.
+    """
+
+    def __init__(
+        self, defs: dict[str, Any] | None, /, passes: Sequence[NormalizationPass]
+    ):
+        #: Definitions of the schema, i.e. its ``$defs`` (Pydantic 2.x) or
+        #: ``definitions`` (Pydantic 1.x), removed from the normalized schema.
+        self.defs: dict[str, Any] = defs or {}
+        #: Normalization passes being applied.
+        self.passes = passes
+        self._resolved_defs: dict[str, dict[str, Any]] = {}
+        self._graph = {
+            def_id: {_get_def_id(ref) for ref in _iter_refs(definition)}
+            for def_id, definition in self.defs.items()
+        }
+        self._recursive_defs = _find_recursive_defs(self._graph)
+        self._used_recursive_defs: dict[str, None] = {}
+
+    def get_def(self, ref: str, /) -> dict[str, Any]:
+        """Return the definition that *ref* (e.g. ``"#/$defs/MyEnum"``)
+        points to, with its own references resolved.
+
+        Definitions are resolved only once, and the same object is returned
+        for every reference to them, so it must not be modified. Inline a copy
+        of it instead, so that the normalized schema does not share objects
+        between parameters.
+        """
+        def_id = _get_def_id(ref)
+        try:
+            return self._resolved_defs[def_id]
+        except KeyError:
+            pass
+        # Resolve dependencies first, so that the recursion depth does not
+        # grow with the nesting depth of definitions.
+        for unresolved_id in self._iter_unresolved(def_id):
+            definition = cast("dict[str, Any]", self.defs[unresolved_id])
+            self._resolved_defs[unresolved_id] = definition
+            _inline_refs(definition, self)
+        return self._resolved_defs[def_id]
+
+    def is_recursive(self, ref: str, /) -> bool:
+        """Return ``True`` if the definition that *ref* points to references
+        itself, directly or indirectly, and hence cannot be inlined.
+        """
+        return _get_def_id(ref) in self._recursive_defs
+
+    def _iter_unresolved(self, def_id: str, /) -> Iterator[str]:
+        """Yield *def_id* and its unresolved dependencies in post-order."""
+        seen = {def_id}
+        work = [(def_id, iter(self._graph[def_id]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if (
+                    child in seen
+                    or child in self._resolved_defs
+                    or child not in self._graph
+                ):
+                    continue
+                seen.add(child)
+                work.append((child, iter(self._graph[child])))
+                break
+            else:
+                work.pop()
+                yield node
+
+    def _keep_ref(self, ref: str, /) -> str:
+        def_id = _get_def_id(ref)
+        self._used_recursive_defs[def_id] = None
+        return f"#/$defs/{def_id}"
+
+    def _get_kept_defs(self) -> dict[str, Any]:
+        kept_defs: dict[str, Any] = {}
+        while len(kept_defs) < len(self._used_recursive_defs):
+            for def_id in list(self._used_recursive_defs):
+                if def_id not in kept_defs:
+                    kept_defs[def_id] = self.get_def(f"#/$defs/{def_id}")
+        return kept_defs
+
+    def _resolve(self, schema: dict[str, Any], /) -> None:
+        properties = schema.get("properties")
+        if properties:
+            for key, value in properties.items():
+                for normalization_pass in self.passes:
+                    normalization_pass(key, value, self)
+        for key in ("items", "additionalProperties"):
+            subschema = schema.get(key)
+            if isinstance(subschema, dict):
+                _inline_refs(subschema, self)
+        for subschema in schema.get("prefixItems", ()):
+            _inline_refs(subschema, self)
+
+
+NormalizationPass = Callable[[str, dict[str, Any], NormalizationContext], None]
 
-    extra = value.pop("json_schema_extra", None)
+
+def hoist_json_schema_extra(
+    name: str, param: dict[str, Any], context: NormalizationContext, /
+) -> None:
+    """Move the contents of ``json_schema_extra`` (Pydantic 1.x) into the
+    parameter schema.
+    """
+    extra = param.pop("json_schema_extra", None)
     if extra:
-        # pydantic 1.x
-        value.update(extra)
+        param.update(extra)
+
 
-    allof = value.pop("allOf", None)
+def _inline_refs(schema: dict[str, Any], context: NormalizationContext, /) -> None:
+    context._resolve(schema)
+
+    allof = schema.pop("allOf", None)
     if allof is not None:
         for entry in allof:
             ref = entry.pop("$ref", None)
             if ref:
-                entry.update(get_def(ref))
+                if context.is_recursive(ref):
+                    schema["$ref"] = context._keep_ref(ref)
+                    continue
+                entry.update(copy.deepcopy(context.get_def(ref)))
+            else:
+                context._resolve(entry)
             entry.pop("title", None)
             entry.pop("description", None)
-            value.update(entry)
+            schema.update(entry)
 
-    anyof = value.get("anyOf")
+    anyof = schema.get("anyOf")
     if anyof is not None:
         for entry in anyof:
             ref = entry.pop("$ref", None)
             if not ref:
+                _inline_refs(entry, context)
+                continue
+            if context.is_recursive(ref):
+                entry["$ref"] = context._keep_ref(ref)
                 continue
-            def_copy = copy.copy(get_def(ref))
+            def_copy = copy.deepcopy(context.get_def(ref))
             if "type" in def_copy:
                 entry["type"] = def_copy.pop("type")
             def_copy.pop("title", None)
             def_copy.pop("description", None)
-            value.update(def_copy)
+            schema.update(def_copy)
 
-    ref = value.pop("$ref", None)
+    ref = schema.pop("$ref", None)
     if ref:
-        def_copy = copy.copy(get_def(ref))
+        if context.is_recursive(ref):
+            schema["$ref"] = context._keep_ref(ref)
+            return
+        def_copy = copy.deepcopy(context.get_def(ref))
         def_copy.pop("title", None)
         def_copy.pop("description", None)
-        value.update(def_copy)
+        schema.update(def_copy)
+
+
+def inline_refs(
+    name: str, param: dict[str, Any], context: NormalizationContext, /
+) -> None:
+    """Replace references to definitions, directly or in ``allOf`` or
+    ``anyOf``, with the referenced definition, minus its title and
+    description.
+
+    References are also resolved in nested schemas, i.e. ``properties`` of
+    nested models, which get all normalization passes, and ``items``,
+    ``additionalProperties`` and ``prefixItems``. References to recursive
+    definitions are kept, pointing to a ``$defs`` key that is kept in the
+    normalized schema for those definitions only.
+    """
+    _inline_refs(param, context)
+
+
+def _get_default_title(name: str, /) -> str:
+    return name.title().replace("_", " ")
+
+
+def add_title(
+    name: str, param: dict[str, Any], context: NormalizationContext, /
+) -> None:
+    """Set a title based on the parameter name if there is none, e.g.
+    ``"Max Pages"`` for ``max_pages``.
+    """
+    if "title" not in param:
+        param["title"] = _get_default_title(name)
+
+
+def remove_title(
+    name: str, param: dict[str, Any], context: NormalizationContext, /
+) -> None:
+    """Remove the parameter title."""
+    param.pop("title", None)
+
+
+def remove_description(
+    name: str, param: dict[str, Any], context: NormalizationContext, /
+) -> None:
+    """Remove the parameter description."""
+    param.pop("description", None)
+
 
-    if "title" not in value:
-        value["title"] = key.title().replace("_", " ")
+#: Normalization passes applied by default.
+DEFAULT_NORMALIZATION_PASSES: tuple[NormalizationPass, ...] = (
+    hoist_json_schema_extra,
+    inline_refs,
+    add_title,
+)
 
 
-def normalize_param_schema(schema: dict[str, Any], /) -> None:
+def _has_unresolved_refs(schema: dict[str, Any], kept_defs: dict[str, Any], /) -> bool:
+    kept_refs = {f"#/$defs/{def_id}" for def_id in kept_defs}
+    return any(ref not in kept_refs for ref in _iter_refs(schema))
+
+
+def normalize_param_schema(
+    schema: dict[str, Any],
+    /,
+    passes: Sequence[NormalizationPass] = DEFAULT_NORMALIZATION_PASSES,
+    *,
+    canonical: bool = False,
+) -> None:
     params = schema.get("properties")
-    if not params:
-        return
-    defs = schema.pop("$defs", None)
-    if not defs:
-        # pydantic 1.x
-        defs = schema.pop("definitions", None)
-    for key, value in params.items():
-        _normalize_param(key, value, defs)
+    if params:
+        defs_key = "$defs" if schema.get("$defs") else "definitions"  # pydantic 1.x
+        defs = schema.pop(defs_key, None)
+        context = NormalizationContext(defs, passes=passes)
+        context._resolve(schema)
+        kept_defs = context._get_kept_defs()
+        if kept_defs:
+            schema["$defs"] = kept_defs
+        if defs and _has_unresolved_refs(schema, kept_defs):
+            # Passes other than inline_refs can leave references to
+            # definitions, so definitions are kept for them.
+            schema.setdefault(defs_key, {}).update(defs)
+    if canonical:
+        canonicalize_param_schema(schema)
+
+
+# Keywords which values are a schema, a list of schemas, or a mapping of
+# names to schemas.
+_SCHEMA_KEYWORDS = frozenset(
+    {"additionalProperties", "contains", "else", "if", "items", "not", "then"}
+)
+_SCHEMA_LIST_KEYWORDS = frozenset({"allOf", "anyOf", "oneOf", "prefixItems"})
+_SCHEMA_MAP_KEYWORDS = frozenset({"$defs", "definitions", "patternProperties"})
+
+
+def _iter_subschemas(
+    schema: dict[str, Any], /
+) -> Iterator[tuple[str | None, dict[str, Any]]]:
+    """Yield ``(property name or None, subschema)`` for the direct
+    subschemas of *schema*.
+    """
+    for key, value in schema.items():
+        if key == "properties" and isinstance(value, dict):
+            for name, subschema in value.items():
+                if isinstance(subschema, dict):
+                    yield name, subschema
+        elif key in _SCHEMA_KEYWORDS and isinstance(value, dict):
+            yield None, value
+        elif key in _SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            for subschema in value:
+                if isinstance(subschema, dict):
+                    yield None, subschema
+        elif key in _SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            for subschema in value.values():
+                if isinstance(subschema, dict):
+                    yield None, subschema
+
+
+def _walk_schema(
+    schema: dict[str, Any], /
+) -> Iterator[tuple[str | None, dict[str, Any]]]:
+    stack: list[tuple[str | None, dict[str, Any]]] = [(None, schema)]
+    while stack:
+        name, node = stack.pop()
+        yield name, node
+        stack.extend(_iter_subschemas(node))
+
+
+# Keywords which values are or contain subschemas.
+_SUBSCHEMA_KEYWORDS = (
+    _SCHEMA_KEYWORDS
+    | _SCHEMA_LIST_KEYWORDS
+    | _SCHEMA_MAP_KEYWORDS
+    | frozenset({"properties"})
+)
+# Keywords which values are lists of schemas in no particular order.
+_UNORDERED_SCHEMA_LIST_KEYWORDS = frozenset({"allOf", "anyOf", "oneOf"})
+
+
+def _get_canonical_sort_key(schema: Any, /) -> tuple[bool, str]:
+    # Null last, e.g. for optional parameters.
+    return schema == {"type": "null"}, json.dumps(schema, sort_keys=True)
+
+
+def _sort_keys(mapping: dict[str, Any], /) -> None:
+    items = sorted(mapping.items())
+    mapping.clear()
+    mapping.update(items)
+
+
+def _sort_data_keys(value: Any, /) -> None:
+    if isinstance(value, dict):
+        for item in value.values():
+            _sort_data_keys(item)
+        _sort_keys(value)
+    elif isinstance(value, list):
+        for item in value:
+            _sort_data_keys(item)
+
+
+def canonicalize_param_schema(schema: dict[str, Any], /) -> None:
+    """Sort *schema* in place into a canonical order, so that equivalent
+    schemas are also equal when serialized, regardless of the order in which
+    they were generated.
+
+    -   Keys of the schema, of its subschemas and of objects in values that
+        are not schemas, e.g. ``default``, are sorted, except for the names
+        of ``properties``, which keep their declaration order. Lists in
+        values that are not schemas, e.g. ``enum``, keep their order.
+
+    -   ``required`` follows the order of ``properties``.
+
+    -   ``$defs`` are sorted by name.
+
+    -   Entries of ``allOf``, ``anyOf`` and ``oneOf`` are sorted by their
+        JSON representation, with ``{"type": "null"}`` last.
+    """
+    # Children before parents, so that lists of subschemas are sorted by their
+    # canonical representation.
+    for _, node in reversed(list(_walk_schema(schema))):
+        for key in _UNORDERED_SCHEMA_LIST_KEYWORDS:
+            subschemas = node.get(key)
+            if isinstance(subschemas, list):
+                subschemas.sort(key=_get_canonical_sort_key)
+        for key in _SCHEMA_MAP_KEYWORDS:
+            subschemas = node.get(key)
+            if isinstance(subschemas, dict):
+                _sort_keys(subschemas)
+        properties = node.get("properties")
+        required = node.get("required")
+        if isinstance(properties, dict) and isinstance(required, list):
+            order = {name: index for index, name in enumerate(properties)}
+            required.sort(key=lambda name: order.get(name, len(order)))
+        for key, value in node.items():
+            if key not in _SUBSCHEMA_KEYWORDS:
+                _sort_data_keys(value)
+        _sort_keys(node)
+
+
+COMPACT_SCHEMA_VERSION = 1
+
+
+def _copy_tree(schema: dict[str, Any], /) -> dict[str, Any]:
+    # Unlike copy.deepcopy, which keeps objects shared within schema shared,
+    # so that they would be visited, and modified, more than once.
+    return cast("dict[str, Any]", json.loads(json.dumps(schema)))
+
+
+def compact_param_schema(schema: dict[str, Any], /) -> dict[str, Any]:
+    """Return a smaller version of a :ref:`parameter schema <params-schema>`,
+    e.g. to send it to a user interface.
+
+    -   Enums used more than once are moved into a top-level ``$enums`` list,
+        and replaced by their index in that list, as ``{"$enum": index}``.
+
+    -   Property titles that :func:`add_title` would generate are removed.
+        Properties without a title get a ``null`` title.
+
+    The result is marked with a ``$compact`` key, and
+    :func:`expand_param_schema` turns it back into *schema*. To minimize its
+    size further, serialize it without whitespace, e.g. with
+    ``json.dumps(compact_schema, separators=(",", ":"))``.
+
+    *schema* must be JSON-serializable.
+    """
+    compact_schema = _copy_tree(schema)
+    enum_counts: dict[str, int] = {}
+    enum_nodes = []
+    for name, node in _walk_schema(compact_schema):
+        if name is not None:
+            title = node.get("title")
+            if title is None:
+                node["title"] = None
+            elif title == _get_default_title(name):
+                del node["title"]
+        enum = node.get("enum")
+        if isinstance(enum, list):
+            key = json.dumps(enum, sort_keys=True)
+            enum_counts[key] = enum_counts.get(key, 0) + 1
+            enum_nodes.append((key, node))
+    enum_indexes: dict[str, int] = {}
+    enums: list[list[Any]] = []
+    for key, node in enum_nodes:
+        if enum_counts[key] < 2:
+            continue
+        try:
+            index = enum_indexes[key]
+        except KeyError:
+            index = enum_indexes[key] = len(enums)
+            enums.append(node["enum"])
+        node["$enum"] = index
+        del node["enum"]
+    compact_schema["$compact"] = COMPACT_SCHEMA_VERSION
+    if enums:
+        compact_schema["$enums"] = enums
+    return compact_schema
+
+
+def expand_param_schema(compact_schema: dict[str, Any], /) -> dict[str, Any]:
+    """Return the parameter schema that *compact_schema*, returned by
+    :func:`compact_param_schema`, was built from.
+    """
+    schema = _copy_tree(compact_schema)
+    version = schema.pop("$compact", None)
+    if version != COMPACT_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported compact schema version: {version!r}")
+    enums = schema.pop("$enums", [])
+    for name, node in _walk_schema(schema):
+        if name is not None:
+            if "title" not in node:
+                node["title"] = _get_default_title(name)
+            elif node["title"] is None:
+                del node["title"]
+        index = node.pop("$enum", None)
+        if index is not None:
+            node["enum"] = copy.deepcopy(enums[index])
+    return schema
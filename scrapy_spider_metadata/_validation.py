@@ -0,0 +1,551 @@
+"""Built-in validation of plain :mod:`dataclasses` used as :ref:`parameter
+specification <define-params>` classes, so that spiders with simple parameters
+do not need to import Pydantic.
+
+A validator is compiled once per field. Validators convert arguments the way
+Pydantic 2.x does in lax mode, report errors in the format of
+:meth:`pydantic.ValidationError.errors`, and the generated JSON Schema is the
+one Pydantic 2.x generates for the same class as a pydantic dataclass.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import inspect
+import types
+from enum import Enum
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from ._compat import ParamDefaults, call_default_factory, call_default_getters
+from ._types import FileLines
+
+Validator = Callable[[Any, tuple[Any, ...], list[dict[str, Any]]], Any]
+Serializer = Callable[[Any], Any]
+
+_INVALID = object()
+_MISSING = object()
+_NONE_TYPE = type(None)
+_UNION_TYPES = (Union, getattr(types, "UnionType", Union))
+_TRUE_STRINGS = frozenset({"1", "on", "t", "true", "y", "yes"})
+_FALSE_STRINGS = frozenset({"0", "off", "f", "false", "n", "no"})
+
+
+class ParamValidationError(ValueError):
+    """Raised when :ref:`spider arguments <spiderargs>` do not match a
+    :ref:`dataclass parameter specification <dataclass-params>`.
+
+    It is the counterpart of :exc:`pydantic.ValidationError`, and its message
+    has the same format.
+    """
+
+    def __init__(self, title: str, errors: list[dict[str, Any]]):
+        #: Name of the parameter specification class.
+        self.title = title
+        self._errors = errors
+        super().__init__(self._format())
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return self.__class__, (self.title, self._errors)
+
+    def _format(self) -> str:
+        count = len(self._errors)
+        lines = [
+            f"{count} validation error{'' if count == 1 else 's'} for {self.title}"
+        ]
+        for error in self._errors:
+            if error["loc"]:
+                lines.append(".".join(str(item) for item in error["loc"]))
+            value = error["input"]
+            lines.append(
+                f"  {error['msg']} [type={error['type']}, input_value={value!r}, "
+                f"input_type={type(value).__name__}]"
+            )
+        return "\n".join(lines)
+
+    def errors(self) -> list[dict[str, Any]]:
+        """Return the validation errors, in the format of
+        :meth:`pydantic.ValidationError.errors`.
+        """
+        return [dict(error) for error in self._errors]
+
+    def error_count(self) -> int:
+        return len(self._errors)
+
+
+def _error(
+    errors: list[dict[str, Any]],
+    error_type: str,
+    loc: tuple[Any, ...],
+    msg: str,
+    value: Any,
+    /,
+    **ctx: Any,
+) -> Any:
+    error = {"type": error_type, "loc": loc, "msg": msg, "input": value}
+    if ctx:
+        error["ctx"] = ctx
+    errors.append(error)
+    return _INVALID
+
+
+def _parse_int(value: str, loc: tuple[Any, ...], errors: list[dict[str, Any]]) -> Any:
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    # "1.0", "1.00", etc.
+    integer, _, fraction = value.strip().partition(".")
+    if integer and fraction and not fraction.strip("0"):
+        try:
+            return int(integer)
+        except ValueError:
+            pass
+    return _error(
+        errors,
+        "int_parsing",
+        loc,
+        "Input should be a valid integer, unable to parse string as an integer",
+        value,
+    )
+
+
+def _validate_int(
+    value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]
+) -> Any:
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str):
+        return _parse_int(value, loc, errors)
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return _error(
+            errors,
+            "int_from_float",
+            loc,
+            "Input should be a valid integer, got a number with a fractional part",
+            value,
+        )
+    return _error(errors, "int_type", loc, "Input should be a valid integer", value)
+
+
+def _validate_float(
+    value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]
+) -> Any:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return _error(
+                errors,
+                "float_parsing",
+                loc,
+                "Input should be a valid number, unable to parse string as a number",
+                value,
+            )
+    return _error(errors, "float_type", loc, "Input should be a valid number", value)
+
+
+def _validate_bool(
+    value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]
+) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+        return _error(
+            errors,
+            "bool_parsing",
+            loc,
+            "Input should be a valid boolean, unable to interpret input",
+            value,
+        )
+    if isinstance(value, (int, float)):
+        if value in (0, 1):
+            return bool(value)
+        return _error(
+            errors,
+            "bool_parsing",
+            loc,
+            "Input should be a valid boolean, unable to interpret input",
+            value,
+        )
+    return _error(errors, "bool_type", loc, "Input should be a valid boolean", value)
+
+
+def _validate_str(
+    value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]
+) -> Any:
+    if isinstance(value, str):
+        return value
+    return _error(errors, "string_type", loc, "Input should be a valid string", value)
+
+
+def _validate_file_lines(
+    value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]
+) -> Any:
+    try:
+        return FileLines._validate(value)
+    except (TypeError, ValueError) as e:
+        return _error(errors, "value_error", loc, f"Value error, {e}", value, error=e)
+
+
+_SCALARS: dict[Any, tuple[Validator, dict[str, Any]]] = {
+    bool: (_validate_bool, {"type": "boolean"}),
+    float: (_validate_float, {"type": "number"}),
+    int: (_validate_int, {"type": "integer"}),
+    str: (_validate_str, {"type": "string"}),
+}
+
+
+def _get_choice_validator(
+    choices: dict[Any, Any], error_type: str, values: list[Any]
+) -> Validator:
+    reprs = [repr(value) for value in values]
+    expected = (
+        reprs[0] if len(reprs) == 1 else f"{', '.join(reprs[:-1])} or {reprs[-1]}"
+    )
+
+    def validate(value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]) -> Any:
+        try:
+            return choices[value]
+        except (KeyError, TypeError):
+            return _error(
+                errors,
+                error_type,
+                loc,
+                f"Input should be {expected}",
+                value,
+                expected=expected,
+            )
+
+    return validate
+
+
+def _get_list_validator(item_validator: Validator) -> Validator:
+    def validate(value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]) -> Any:
+        if not isinstance(value, (list, tuple)):
+            return _error(
+                errors, "list_type", loc, "Input should be a valid list", value
+            )
+        error_count = len(errors)
+        result = [
+            item_validator(item, (*loc, index), errors)
+            for index, item in enumerate(value)
+        ]
+        return _INVALID if len(errors) > error_count else result
+
+    return validate
+
+
+def _get_optional_validator(validator: Validator) -> Validator:
+    def validate(value: Any, loc: tuple[Any, ...], errors: list[dict[str, Any]]) -> Any:
+        if value is None:
+            return None
+        return validator(value, loc, errors)
+
+    return validate
+
+
+def _get_json_type(values: list[Any]) -> dict[str, Any]:
+    value_types = {type(value) for value in values}
+    if value_types == {str}:
+        return {"type": "string"}
+    if value_types == {bool}:
+        return {"type": "boolean"}
+    if value_types == {int}:
+        return {"type": "integer"}
+    if value_types and value_types <= {int, float}:
+        return {"type": "number"}
+    return {}
+
+
+class _Compiler:
+    """Builds the validator, serializer and JSON Schema of field types,
+    collecting the definitions of enums.
+    """
+
+    def __init__(self, param_model: type[Any]):
+        self.param_model = param_model
+        self.defs: dict[str, Any] = {}
+        self._def_names: dict[type[Enum], str] = {}
+        self.has_file_lines = False
+
+    def _unsupported(self, annotation: Any) -> TypeError:
+        return TypeError(
+            f"{self.param_model!r} has a parameter of type {annotation!r}, which "
+            f"is not supported in dataclass parameter specifications. Use a "
+            f"pydantic.BaseModel subclass instead."
+        )
+
+    def compile(
+        self, annotation: Any
+    ) -> tuple[Validator, Serializer | None, dict[str, Any]]:
+        origin = get_origin(annotation)
+        if origin in _UNION_TYPES:
+            args = get_args(annotation)
+            non_none_args = [arg for arg in args if arg is not _NONE_TYPE]
+            if len(args) != 2 or len(non_none_args) != 1:
+                raise self._unsupported(annotation)
+            validator, serializer, schema = self.compile(non_none_args[0])
+            return (
+                _get_optional_validator(validator),
+                serializer,
+                {"anyOf": [schema, {"type": "null"}]},
+            )
+        if origin is list:
+            args = get_args(annotation)
+            if not args:
+                raise self._unsupported(annotation)
+            validator, serializer, schema = self.compile(args[0])
+            return (
+                _get_list_validator(validator),
+                None if serializer is None else _get_list_serializer(serializer),
+                {"items": schema, "type": "array"},
+            )
+        if origin is Literal:
+            values = list(get_args(annotation))
+            literal_schema: dict[str, Any] = (
+                {"const": values[0]} if len(values) == 1 else {"enum": values}
+            )
+            return (
+                _get_choice_validator(
+                    {value: value for value in values}, "literal_error", values
+                ),
+                None,
+                {**literal_schema, **_get_json_type(values)},
+            )
+        if annotation is FileLines:
+            self.has_file_lines = True
+            return _validate_file_lines, str, {"type": "string"}
+        if isinstance(annotation, type) and issubclass(annotation, Enum):
+            return self._compile_enum(annotation)
+        try:
+            validator, schema = _SCALARS[annotation]
+        except (KeyError, TypeError):
+            raise self._unsupported(annotation) from None
+        return validator, None, dict(schema)
+
+    def _compile_enum(
+        self, enum_cls: type[Enum]
+    ) -> tuple[Validator, Serializer | None, dict[str, Any]]:
+        members = list(enum_cls)
+        values = [member.value for member in members]
+        choices: dict[Any, Any] = {member: member for member in members}
+        choices.update((member.value, member) for member in members)
+        for member in members:
+            # Arguments from the command line are strings.
+            choices.setdefault(str(member.value), member)
+        name = self._def_names.get(enum_cls)
+        if name is None:
+            name = enum_cls.__name__
+            if name in self.defs:
+                name = f"{enum_cls.__module__}__{enum_cls.__qualname__}"
+            self._def_names[enum_cls] = name
+            self.defs[name] = {
+                "enum": values,
+                "title": enum_cls.__name__,
+                **_get_json_type(values),
+            }
+        return (
+            _get_choice_validator(choices, "enum", values),
+            _serialize_enum,
+            {"$ref": f"#/$defs/{name}"},
+        )
+
+
+def _serialize_enum(value: Enum) -> Any:
+    return value.value
+
+
+def _get_list_serializer(item_serializer: Serializer) -> Serializer:
+    def serialize(value: Any) -> Any:
+        if value is None:
+            return None
+        return [item_serializer(item) for item in value]
+
+    return serialize
+
+
+def _serialize_optional(value: Any, serializer: Serializer | None = None) -> Any:
+    return value if serializer is None or value is None else serializer(value)
+
+
+def _has_ref(schema: dict[str, Any]) -> bool:
+    return "$ref" in schema or any("$ref" in entry for entry in schema.get("anyOf", ()))
+
+
+def _get_description(param_model: type[Any]) -> str | None:
+    doc = param_model.__doc__
+    if not doc:
+        return None
+    # Docstring generated by the dataclass decorator.
+    try:
+        signature = str(inspect.signature(param_model)).replace(" -> None", "")
+    except (TypeError, ValueError):
+        signature = None
+    if doc == f"{param_model.__name__}{signature}":
+        return None
+    return inspect.cleandoc(doc)
+
+
+def is_plain_dataclass(param_model: Any, /) -> bool:
+    """Return ``True`` if *param_model* is a dataclass that is not a pydantic
+    dataclass.
+    """
+    return (
+        isinstance(param_model, type)
+        and dataclasses.is_dataclass(param_model)
+        and not hasattr(param_model, "__pydantic_decorators__")
+        # pydantic 1.x
+        and not hasattr(param_model, "__pydantic_model__")
+    )
+
+
+class DataclassAdapter:
+    """Validates and serializes instances of a plain dataclass, and generates
+    its JSON Schema, with the subset of the :class:`pydantic.TypeAdapter` API
+    that :class:`~scrapy_spider_metadata.Args` uses.
+    """
+
+    def __init__(self, param_model: type[Any]):
+        self.param_model = param_model
+        compiler = _Compiler(param_model)
+        hints = get_type_hints(param_model)
+        self._fields: list[tuple[str, Validator, bool]] = []
+        self._serializers: list[tuple[str, Serializer | None]] = []
+        #: Whether validation depends only on the input, as required by the
+        #: arguments cache.
+        self.is_cacheable = not hasattr(param_model, "__post_init__")
+        properties: dict[str, Any] = {}
+        required = []
+        for field in dataclasses.fields(param_model):
+            annotation = hints[field.name]
+            validator, serializer, schema = compiler.compile(annotation)
+            self._serializers.append((field.name, serializer))
+            if field.default_factory is not dataclasses.MISSING:
+                self.is_cacheable = False
+            if not field.init:
+                continue
+            is_required = (
+                field.default is dataclasses.MISSING
+                and field.default_factory is dataclasses.MISSING
+            )
+            self._fields.append((field.name, validator, is_required))
+            properties[field.name] = self._get_field_schema(field, schema, serializer)
+            if is_required:
+                required.append(field.name)
+        if compiler.has_file_lines:
+            # FileLines validation checks the file system.
+            self.is_cacheable = False
+        self._schema: dict[str, Any] = {}
+        if compiler.defs:
+            self._schema["$defs"] = dict(sorted(compiler.defs.items()))
+        description = _get_description(param_model)
+        if description:
+            self._schema["description"] = description
+        self._schema["properties"] = properties
+        if required:
+            self._schema["required"] = required
+        self._schema["title"] = param_model.__name__
+        self._schema["type"] = "object"
+
+    @staticmethod
+    def _get_field_schema(
+        field: dataclasses.Field[Any],
+        schema: dict[str, Any],
+        serializer: Serializer | None,
+    ) -> dict[str, Any]:
+        if not _has_ref(schema):
+            schema["title"] = field.name.title().replace("_", " ")
+        if field.default is not dataclasses.MISSING:
+            schema["default"] = (
+                field.default
+                if serializer is None or field.default is None
+                else serializer(field.default)
+            )
+        for key in ("title", "description"):
+            if key in field.metadata:
+                schema[key] = field.metadata[key]
+        schema.update(field.metadata.get("json_schema_extra", {}))
+        return dict(sorted(schema.items()))
+
+    def validate_python(self, kwargs: dict[str, Any]) -> Any:
+        errors: list[dict[str, Any]] = []
+        values = {}
+        for name, validator, is_required in self._fields:
+            value = kwargs.get(name, _MISSING)
+            if value is _MISSING:
+                if is_required:
+                    _error(errors, "missing", (name,), "Field required", kwargs)
+                continue
+            values[name] = validator(value, (name,), errors)
+        if errors:
+            raise ParamValidationError(self.param_model.__name__, errors)
+        try:
+            return self.param_model(**values)
+        except ValueError as e:
+            # Raised by __post_init__.
+            raise ParamValidationError(
+                self.param_model.__name__,
+                [
+                    {
+                        "type": "value_error",
+                        "loc": (),
+                        "msg": f"Value error, {e}",
+                        "input": kwargs,
+                    }
+                ],
+            ) from e
+
+    def dump_python(self, args: Any, mode: str = "json") -> dict[str, Any]:
+        assert mode == "json"
+        result = {}
+        for name, serializer in self._serializers:
+            value = getattr(args, name)
+            result[name] = (
+                value if serializer is None or value is None else serializer(value)
+            )
+        return result
+
+    def get_defaults(self) -> ParamDefaults:
+        """Return a function that returns the default values of optional
+        fields, and the names of required fields.
+        """
+        serializers = dict(self._serializers)
+        defaults: list[tuple[str, Callable[[], Any]]] = []
+        for field in dataclasses.fields(self.param_model):
+            if not field.init:
+                continue
+            serialize = partial(_serialize_optional, serializer=serializers[field.name])
+            get_default: Callable[[], Any]
+            if field.default is not dataclasses.MISSING:
+                get_default = partial(copy.deepcopy, serialize(field.default))
+            elif field.default_factory is not dataclasses.MISSING:
+                get_default = partial(
+                    call_default_factory, field.default_factory, (), serialize
+                )
+            else:
+                continue
+            defaults.append((field.name, get_default))
+        required = [name for name, _, is_required in self._fields if is_required]
+        return partial(call_default_getters, defaults), required
+
+    def json_schema(self) -> dict[str, Any]:
+        return copy.deepcopy(self._schema)
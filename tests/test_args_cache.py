@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Optional
+
+import pytest
+from packaging import version
+from pydantic import BaseModel, Field, ValidationError
+from pydantic.version import VERSION as PYDANTIC_VERSION
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args, ArgsCacheInfo, FileLines
+from scrapy_spider_metadata._args_cache import copy_args, hash_args
+
+from . import get_spider
+
+
+class Params(BaseModel):
+    foo: int
+    bar: list[str] = []
+    baz: Optional[dict[str, list[int]]] = None
+
+
+def test_cache():
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+        args_cache_size = 2
+
+    spider = get_spider(ParamSpider, kwargs={"foo": "1", "bar": "a,b"})
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(0, 1, 2, 1)
+    spider.args.bar.append("c")
+
+    spider = get_spider(ParamSpider, kwargs={"bar": "a,b", "foo": "1"})
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(1, 1, 2, 1)
+    assert spider.args == Params(foo=1, bar=["a", "b"])
+    assert spider.foo == "1"  # type: ignore[attr-defined]
+
+    get_spider(ParamSpider, kwargs={"foo": "2"})
+    get_spider(ParamSpider, kwargs={"foo": "3"})
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(1, 3, 2, 2)
+
+    # Evicted.
+    get_spider(ParamSpider, kwargs={"foo": "1", "bar": "a,b"})
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(1, 4, 2, 2)
+
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"foo": "a"})
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"foo": "a"})
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(1, 6, 2, 2)
+
+
+def test_cache_disabled():
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    get_spider(ParamSpider, kwargs={"foo": "1"})
+    assert ParamSpider.get_args_cache_info() is None
+
+
+class ValidatorParams(BaseModel):
+    foo: FileLines
+
+
+class DefaultFactoryParams(BaseModel):
+    foo: datetime = Field(default_factory=datetime.now)
+
+
+class NestedParams(BaseModel):
+    foo: DefaultFactoryParams
+
+
+@pytest.mark.parametrize(
+    "params", [ValidatorParams, DefaultFactoryParams, NestedParams]
+)
+def test_cache_impure(params):
+    class ParamSpider(Args[params], Spider):  # type: ignore[valid-type]
+        name = "params"
+        args_cache_size = 2
+
+    assert ParamSpider.get_args_cache_info() is None
+
+
+@pytest.mark.skipif(
+    version.parse(PYDANTIC_VERSION).major < 2, reason="Requires Pydantic 2.x."
+)
+def test_cache_typeddict():
+    from typing_extensions import TypedDict
+
+    class TypedDictParams(TypedDict):
+        foo: int
+        bar: list[str]
+
+    class ParamSpider(Args[TypedDictParams], Spider):
+        name = "params"
+        args_cache_size = 1
+
+    get_spider(ParamSpider, kwargs={"foo": "1", "bar": "a"})
+    spider = get_spider(ParamSpider, kwargs={"foo": "1", "bar": "a"})
+    assert spider.args == {"foo": 1, "bar": ["a"]}
+    assert ParamSpider.get_args_cache_info() == ArgsCacheInfo(1, 1, 1, 1)
+
+
+def test_hash_args():
+    assert hash_args({"a": "1", "b": "2"}) == hash_args({"b": "2", "a": "1"})
+    assert hash_args({"a": "1"}) != hash_args({"a": 1})
+    assert hash_args({"a": object()}) is None
+
+
+def test_copy_args():
+    args = Params(foo=1, bar=["a"], baz={"a": [1]})
+    args_copy = copy_args(args)
+    assert args_copy == args
+    assert args_copy.bar is not args.bar
+    assert args_copy.baz is not None
+    assert args.baz is not None
+    assert args_copy.baz is not args.baz
+    assert args_copy.baz["a"] is not args.baz["a"]
@@ -0,0 +1,251 @@
+from enum import Enum, IntEnum
+from typing import Optional, Union
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError, validator
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args
+from scrapy_spider_metadata._coercion import get_coercer, get_coercion_plan
+
+from . import get_spider
+from .test_params import USING_PYDANTIC_1
+
+
+class FruitEnum(str, Enum):
+    pear = "pear"
+    banana = "banana"
+
+
+class ToolEnum(IntEnum):
+    spanner = 1
+    wrench = 2
+
+
+class Params(BaseModel):
+    field: int = Field(
+        title="A Team",
+        description="This is a description of the A team.",
+        default=0,
+        ge=0,
+    )
+    int_with_default: int = 1
+    int_optional: Optional[int] = None
+    number: float = 0.0
+    phone: str = Field(min_length=3, max_length=100, default="123")
+    yesno: bool = False
+    fruit: FruitEnum = FruitEnum.pear
+    tool: ToolEnum = ToolEnum.wrench
+    dessert_optional: Optional[FruitEnum] = None
+
+
+class ParamSpider(Args[Params], Spider):
+    name = "params"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"field": "1"},
+        {"field": "-1"},
+        {"field": "+1"},
+        {"field": "01"},
+        {"field": " 1"},
+        {"field": "1_000"},
+        {"field": "1.5"},
+        {"field": "a"},
+        {"field": 3},
+        {"int_optional": "5"},
+        {"int_optional": ""},
+        {"number": "1.5"},
+        {"number": "1e3"},
+        {"number": ".5"},
+        {"number": "5."},
+        {"number": "inf"},
+        {"number": "1e400"},
+        {"number": "x"},
+        {"phone": "12"},
+        {"phone": "123-4567"},
+        {"yesno": "true"},
+        {"yesno": "TRUE"},
+        {"yesno": "Off"},
+        {"yesno": "y"},
+        {"yesno": "2"},
+        {"fruit": "banana"},
+        {"fruit": "apple"},
+        {"tool": "1"},
+        {"tool": "02"},
+        {"tool": "3"},
+        {"dessert_optional": "pear"},
+        {"unknown": "1", "field": "2"},
+        {
+            "field": "2",
+            "int_with_default": "3",
+            "int_optional": "4",
+            "number": "5.5",
+            "phone": "555-5555",
+            "yesno": "no",
+            "fruit": "banana",
+            "tool": "1",
+            "dessert_optional": "banana",
+        },
+    ],
+)
+def test_equivalence(kwargs):
+    try:
+        expected = Params(**kwargs)
+    except ValidationError as exception:
+        expected_errors = [error["loc"] for error in exception.errors()]
+        with pytest.raises(ValidationError) as exc_info:
+            get_spider(ParamSpider, kwargs=kwargs)
+        assert [error["loc"] for error in exc_info.value.errors()] == expected_errors
+    else:
+        spider = get_spider(ParamSpider, kwargs=kwargs)
+        assert spider.args == expected
+        for key, value in kwargs.items():
+            assert getattr(spider, key) == value
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("", []),
+        ("a", ["a"]),
+        ("a,b", ["a", "b"]),
+        ("a, b ", ["a", "b"]),
+        ('["a,b", "c"]', ["a,b", "c"]),
+    ],
+)
+def test_list_str(value, expected):
+    class Params(BaseModel):
+        items: list[str]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    spider = get_spider(ParamSpider, kwargs={"items": value})
+    assert spider.args.items == expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("1,2", [1, 2]),
+        ("[1, 2]", [1, 2]),
+        ('["1", 2]', [1, 2]),
+        ("[]", []),
+    ],
+)
+def test_list_int(value, expected):
+    class Params(BaseModel):
+        items: Optional[list[int]] = None
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    spider = get_spider(ParamSpider, kwargs={"items": value})
+    assert spider.args.items == expected
+
+
+@pytest.mark.parametrize("value", ["1,a", '{"a": 1}', "[1,"])
+def test_list_invalid(value):
+    class Params(BaseModel):
+        items: list[int]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"items": value})
+
+
+def test_list_enum():
+    class Params(BaseModel):
+        fruits: list[FruitEnum]
+        tools: list[ToolEnum]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    spider = get_spider(ParamSpider, kwargs={"fruits": "pear,banana", "tools": "[2]"})
+    assert spider.args.fruits == [FruitEnum.pear, FruitEnum.banana]
+    assert spider.args.tools == [ToolEnum.wrench]
+
+
+@pytest.mark.parametrize(
+    ("annotation", "supported"),
+    [
+        (int, False),
+        (str, False),
+        (FruitEnum, False),
+        (Optional[int], False),
+        (list, True),
+        (list[int], True),
+        (Optional[list[FruitEnum]], True),
+        (Union[list[int], str], False),
+        (dict, False),
+    ],
+)
+def test_get_coercer(annotation, supported):
+    assert (get_coercer(annotation) is not None) is supported
+
+
+def test_validator():
+    class Params(BaseModel):
+        foo: list[str]
+
+        @validator("foo", pre=True)
+        def check_foo(cls, value):
+            assert isinstance(value, str)
+            return value.split("|")
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    assert get_coercion_plan(Params) is None
+    spider = get_spider(ParamSpider, kwargs={"foo": "a,b|c"})
+    assert spider.args.foo == ["a,b", "c"]
+
+
+def test_plan():
+    class Params(BaseModel):
+        foo: list[int]
+        bar: Optional[list[str]] = None
+        baz: int = 0
+
+    class ScalarParams(BaseModel):
+        foo: int
+
+    plan = get_coercion_plan(Params)
+    assert plan is not None
+    assert set(plan) == {"foo", "bar"}
+    assert get_coercion_plan(ScalarParams) is None
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_strict():
+    from pydantic import ConfigDict
+
+    class StrictParams(BaseModel):
+        model_config = ConfigDict(strict=True)
+
+        foo: list[int]
+
+    assert get_coercion_plan(StrictParams) is None
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_strict_field():
+    try:
+
+        class Params(BaseModel):
+            foo: list[int]
+            bar: list[int] = Field(default=[], strict=True)
+
+    except TypeError:
+        pytest.skip("Older Pydantic 2.x versions do not support strict lists")
+
+    plan = get_coercion_plan(Params)
+    assert plan is not None
+    assert set(plan) == {"foo"}
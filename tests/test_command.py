@@ -0,0 +1,142 @@
+import argparse
+import concurrent.futures
+import json
+import optparse
+from pathlib import Path
+from typing import Any
+
+import pytest
+from scrapy.exceptions import UsageError
+from scrapy.settings import Settings
+
+from scrapy_spider_metadata import get_spider_fingerprint, get_spider_metadata
+from scrapy_spider_metadata._command import Command, add_arguments, main
+from tests.test_extension import MetadataSpider, ParamSpider
+
+SETTINGS = ["-s", "SPIDER_MODULES=tests.test_extension"]
+
+
+def test_export(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(SETTINGS) == 0
+    out, err = capsys.readouterr()
+    assert json.loads(out) == {
+        "metadata": get_spider_metadata(MetadataSpider),
+        "params": get_spider_metadata(ParamSpider),
+    }
+    assert err.startswith("Exported the metadata of 2 spiders in ")
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_export_ndjson(capsys: pytest.CaptureFixture[str], jobs: str) -> None:
+    argv = [*SETTINGS, "--format", "ndjson", "--normalize", "--jobs", jobs]
+    assert main([*argv, "--timings", "params"]) == 0
+    out, err = capsys.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {
+            "spider": "params",
+            "metadata": get_spider_metadata(ParamSpider, normalize=True),
+        },
+    ]
+    assert err.startswith("params: ")
+
+
+def test_export_canonical(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main([*SETTINGS, "--normalize", "--canonical", "params"]) == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out)["params"] == get_spider_metadata(
+        ParamSpider, normalize=True, canonical=True
+    )
+
+
+def test_export_fingerprints(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main([*SETTINGS, "--fingerprints"]) == 0
+    out, err = capsys.readouterr()
+    assert json.loads(out) == {
+        "metadata": get_spider_fingerprint(MetadataSpider),
+        "params": get_spider_fingerprint(ParamSpider),
+    }
+    assert err.startswith("Exported the fingerprints of 2 spiders in ")
+
+
+def test_export_unknown_spider(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        main([*SETTINGS, "params", "foo"])
+    assert "Spider not found: foo" in capsys.readouterr().err
+
+
+class ProcessPoolExecutor(concurrent.futures.ProcessPoolExecutor):
+    instances = 0
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        ProcessPoolExecutor.instances += 1
+        super().__init__(*args, **kwargs)
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate_args(
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    jobs: str,
+) -> None:
+    monkeypatch.setattr(
+        "scrapy_spider_metadata._command.ProcessPoolExecutor", ProcessPoolExecutor
+    )
+    monkeypatch.setattr(ProcessPoolExecutor, "instances", 0)
+    path = tmp_path / "args.jsonl"
+    arg_sets = [
+        {"spider": "params", "args": {"foo": "1", "bar": "a,b"}},
+        {"spider": "params", "args": {"foo": "a"}},
+        {"spider": "metadata", "args": {"foo": "a"}},
+        {"spider": "foo"},
+        [],
+        "x",
+        {"spider": "params", "args": []},
+    ]
+    lines = [json.dumps(arg_set) for arg_set in arg_sets]
+    path.write_text("\n".join([*lines, "{"]))
+    assert main([*SETTINGS, "--validate-args", str(path), "--jobs", jobs]) == 1
+    assert ProcessPoolExecutor.instances == (jobs == "2")
+    out, err = capsys.readouterr()
+    results = json.loads(out)
+    assert [result["valid"] for result in results] == [True, False, True] + [False] * 5
+    assert results[1]["errors"][0]["loc"] == ["foo"]
+    assert results[3]["errors"] == [{"msg": "Spider not found: foo"}]
+    assert [result["errors"][0]["msg"] for result in results[4:7]] == [
+        "Expected a JSON object",
+        "Expected a JSON object",
+        "Expected a JSON object as args",
+    ]
+    assert results[7]["errors"][0]["msg"].startswith("Invalid JSON: ")
+    assert err.startswith("Validated 8 argument sets in ")
+
+
+def test_command(capsys: pytest.CaptureFixture[str]) -> None:
+    command = Command()
+    command.settings = Settings({"SPIDER_MODULES": ["tests.test_extension"]})
+    parser = argparse.ArgumentParser()
+    command.add_options(parser)
+    opts = parser.parse_args(["--format", "ndjson"])
+    command.run(["metadata"], opts)
+    assert command.exitcode == 0
+    assert json.loads(capsys.readouterr().out) == {
+        "spider": "metadata",
+        "metadata": get_spider_metadata(MetadataSpider),
+    }
+    with pytest.raises(UsageError):
+        command.run(["foo"], opts)
+
+
+def test_command_optparse(capsys: pytest.CaptureFixture[str]) -> None:
+    # Scrapy < 2.6
+    command = Command()
+    command.settings = Settings({"SPIDER_MODULES": ["tests.test_extension"]})
+    parser = optparse.OptionParser()
+    add_arguments(parser)
+    opts, args = parser.parse_args(["--format", "ndjson", "-j", "1", "metadata"])
+    command.run(args, opts)
+    assert command.exitcode == 0
+    assert json.loads(capsys.readouterr().out) == {
+        "spider": "metadata",
+        "metadata": get_spider_metadata(MetadataSpider),
+    }
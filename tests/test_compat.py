@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+from scrapy_spider_metadata._compat import get_pydantic
+
+from .test_params import USING_PYDANTIC_1
+
+
+class Params(BaseModel):
+    foo: int
+
+
+def test_get_pydantic():
+    pydantic = get_pydantic()
+    assert get_pydantic() is pydantic
+    assert pydantic.v2 is not USING_PYDANTIC_1
+    assert (pydantic.TypeAdapter is None) is USING_PYDANTIC_1
+    assert pydantic.model_dump(Params(foo=1)) == {"foo": 1}
+    assert pydantic.model_json_schema(Params)["properties"] == {
+        "foo": {"title": "Foo", "type": "integer"}
+    }
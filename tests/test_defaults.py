@@ -0,0 +1,129 @@
+import json
+from enum import Enum
+from typing import Optional
+
+import pytest
+from packaging import version
+from pydantic import BaseModel, Field
+from pydantic.version import VERSION as PYDANTIC_VERSION
+from scrapy import Spider
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+
+from scrapy_spider_metadata import Args, get_spider_param_defaults
+
+from . import test_validation
+from .test_extension import MetadataSpider
+from .test_extension import ParamSpider as ExtensionParamSpider
+from .test_params import USING_PYDANTIC_1
+
+EXPECTED = {
+    "defaults": {
+        "query": "books",
+        "ratio": 0.5,
+        "strict": False,
+        "color": "red",
+        "max_items": None,
+        "tags": [],
+        "sort": "asc",
+    },
+    "required": ["pages"],
+}
+
+
+class Mode(Enum):
+    fast = "fast"
+    slow = "slow"
+
+
+class AliasParams(BaseModel):
+    query: str = Field(alias="q")
+    mode: Mode = Mode.fast
+    urls: list[str] = Field(default_factory=lambda: ["https://a.example"])
+    limit: Optional[int] = None
+
+
+class AliasParamSpider(Args[AliasParams], Spider):
+    name = "alias_params"
+
+
+@pytest.mark.parametrize(
+    "spider_cls", [test_validation.ParamSpider, test_validation.ModelParamSpider]
+)
+def test_defaults(spider_cls):
+    defaults = spider_cls.get_param_defaults()
+    assert defaults == EXPECTED
+    assert list(defaults["defaults"]) == list(EXPECTED["defaults"])
+    schema = spider_cls.get_param_schema(normalize=True)
+    assert defaults["required"] == schema["required"]
+    assert set(defaults["defaults"]) | set(defaults["required"]) == set(
+        schema["properties"]
+    )
+
+
+def test_alias():
+    defaults = AliasParamSpider.get_param_defaults()
+    assert defaults == {
+        "defaults": {"mode": "fast", "urls": ["https://a.example"], "limit": None},
+        "required": ["q"],
+    }
+    assert json.loads(json.dumps(defaults)) == defaults
+    schema = AliasParamSpider.get_param_schema(normalize=True)
+    assert set(defaults["defaults"]) | set(defaults["required"]) == set(
+        schema["properties"]
+    )
+
+
+def test_default_factory():
+    defaults = test_validation.ParamSpider.get_param_defaults()
+    defaults["defaults"]["tags"].append("a")
+    assert test_validation.ParamSpider.get_param_defaults() == EXPECTED
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_typeddict():
+    from typing_extensions import NotRequired, TypedDict
+
+    class Params(TypedDict):
+        pages: int
+        query: NotRequired[str]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    assert ParamSpider.get_param_defaults() == {"defaults": {}, "required": ["pages"]}
+
+
+@pytest.mark.skipif(
+    version.parse(str(PYDANTIC_VERSION)) < version.parse("2.10"),
+    reason="Requires Pydantic 2.10+",
+)
+def test_default_factory_validated_data():
+    class Params(BaseModel):
+        pages: int
+        limit: int = 5
+        max_items: int = Field(default_factory=lambda data: data["limit"] * 2)
+        max_pages: int = Field(default_factory=lambda data: data["pages"] * 2)
+        tags: list[str] = Field(default_factory=list)
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    assert ParamSpider.get_param_defaults() == {
+        "defaults": {"limit": 5, "max_items": 10, "tags": []},
+        "required": ["pages"],
+    }
+
+
+def test_bulk():
+    spider_loader = SpiderLoader.from_settings(
+        Settings({"SPIDER_MODULES": ["tests.test_extension"]})
+    )
+    assert get_spider_param_defaults(spider_loader) == {
+        "params": ExtensionParamSpider.get_param_defaults(),
+    }
+    defaults = get_spider_param_defaults(
+        [test_validation.ParamSpider, AliasParamSpider, MetadataSpider]
+    )
+    assert list(defaults) == ["alias_params", "params"]
+    assert defaults["params"] == EXPECTED
@@ -0,0 +1,139 @@
+from datetime import date
+from typing import Any, Optional
+
+import pytest
+from pydantic import BaseModel
+from scrapy import Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.test import get_crawler
+
+from scrapy_spider_metadata import (
+    Args,
+    SpiderMetadataExtension,
+    get_spider_fingerprint,
+    get_spider_metadata,
+)
+
+
+class Params(BaseModel):
+    foo: int
+    bar: list[str] = []
+
+
+class ParamSpider(Args[Params], Spider):
+    name = "params"
+    metadata = {"description": "Spider with parameters."}
+
+
+class MetadataSpider(Spider):
+    name = "metadata"
+    metadata = {"description": "Spider without parameters."}
+
+
+def open_spider(
+    spidercls: type[Spider],
+    settings: Optional[dict[str, Any]] = None,
+    kwargs: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    crawler = get_crawler(spidercls, settings or {})
+    extension = SpiderMetadataExtension.from_crawler(crawler)
+    spider = spidercls.from_crawler(crawler, **(kwargs or {}))
+    extension.spider_opened(spider)
+    assert crawler.stats is not None
+    return crawler.stats.get_stats()
+
+
+def test_stats():
+    stats = open_spider(ParamSpider, kwargs={"foo": "1", "bar": "a,b"})
+    assert stats["spider_metadata/metadata"] == get_spider_metadata(
+        ParamSpider, normalize=True
+    )
+    assert stats["spider_metadata/args"] == {"foo": 1, "bar": ["a", "b"]}
+    assert isinstance(stats["spider_metadata/args_validation_time"], float)
+
+
+def test_stats_copy():
+    stats = open_spider(ParamSpider, kwargs={"foo": "1"})
+    stats["spider_metadata/metadata"]["param_schema"]["properties"].clear()
+    stats = open_spider(ParamSpider, kwargs={"foo": "1"})
+    assert stats["spider_metadata/metadata"] == get_spider_metadata(
+        ParamSpider, normalize=True
+    )
+
+
+def test_stats_no_params():
+    stats = open_spider(MetadataSpider)
+    assert stats == {
+        "spider_metadata/metadata": {"description": "Spider without parameters."},
+        "spider_metadata/fingerprint": get_spider_fingerprint(MetadataSpider),
+    }
+
+
+def test_stats_not_json_serializable(caplog):
+    class DateSpider(Spider):
+        name = "date"
+        metadata = {"since": date(2020, 1, 1)}
+
+    stats = open_spider(DateSpider)
+    assert stats == {"spider_metadata/metadata": {"since": date(2020, 1, 1)}}
+    assert "Could not compute the fingerprint of spider 'date'" in caplog.text
+
+
+def test_stats_disabled():
+    crawler = get_crawler(ParamSpider, {"SPIDER_METADATA_STATS": False})
+    with pytest.raises(NotConfigured):
+        SpiderMetadataExtension.from_crawler(crawler)
+
+
+def test_preload(caplog, monkeypatch):
+    monkeypatch.setattr("scrapy_spider_metadata._extension._preloaded", False)
+    settings = {
+        "SPIDER_METADATA_PRELOAD": True,
+        "SPIDER_MODULES": ["tests.test_extension"],
+    }
+    with caplog.at_level("INFO", logger="scrapy_spider_metadata"):
+        open_spider(ParamSpider, settings, {"foo": "1"})
+        open_spider(ParamSpider, settings, {"foo": "1"})
+    assert [record.getMessage()[:38] for record in caplog.records] == [
+        "Preloaded the metadata of 2 spiders in"
+    ]
+
+
+def test_preload_errors(caplog, monkeypatch):
+    def get_normalized_metadata(spider_cls):
+        if spider_cls is ParamSpider:
+            raise ValueError("Invalid parameters")
+        return {}
+
+    monkeypatch.setattr(
+        "scrapy_spider_metadata._preload._get_normalized_metadata",
+        get_normalized_metadata,
+    )
+    monkeypatch.setattr("scrapy_spider_metadata._extension._preloaded", False)
+    settings = {
+        "SPIDER_METADATA_PRELOAD": True,
+        "SPIDER_MODULES": ["tests.test_extension"],
+    }
+    with caplog.at_level("INFO", logger="scrapy_spider_metadata"):
+        open_spider(MetadataSpider, settings)
+    assert [record.getMessage()[:38] for record in caplog.records] == [
+        "Could not preload spider 'params'",
+        "Preloaded the metadata of 1 spiders in",
+    ]
+
+
+def test_preload_loader_error(caplog, monkeypatch):
+    def get_spider_loader(settings):
+        raise ImportError("No module named 'spiders'")
+
+    monkeypatch.setattr(
+        "scrapy_spider_metadata._extension.get_spider_loader", get_spider_loader
+    )
+    monkeypatch.setattr("scrapy_spider_metadata._extension._preloaded", False)
+    settings = {"SPIDER_METADATA_PRELOAD": True}
+    with caplog.at_level("INFO", logger="scrapy_spider_metadata"):
+        stats = open_spider(MetadataSpider, settings)
+    assert [record.getMessage() for record in caplog.records] == [
+        "Could not load the spiders to preload"
+    ]
+    assert stats["spider_metadata/metadata"] == MetadataSpider.metadata
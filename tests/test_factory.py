@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import gc
+import weakref
+
+import pytest
+from scrapy import Spider
+
+from scrapy_spider_metadata import (
+    Args,
+    ParamValidationError,
+    create_spider_class,
+    get_spider_metadata,
+)
+from scrapy_spider_metadata._params import _get_param_spec
+from scrapy_spider_metadata._utils import get_generic_param
+
+from . import get_spider
+from .test_params import USING_PYDANTIC_1
+from .test_validation import EXPECTED_SCHEMA, Params
+
+
+def get_param_model(spider_cls: type[Spider]) -> type:
+    param_model = get_generic_param(spider_cls, Args)
+    assert param_model is not None
+    return param_model
+
+
+@pytest.mark.parametrize("use_dataclass", [False, True])
+def test_params(use_dataclass):
+    params = {"pages": int, "query": (str, "books"), "tags": (list[str], [])}
+    spider_cls = create_spider_class(
+        "books_toscrape", params, use_dataclass=use_dataclass
+    )
+    assert spider_cls.__name__ == "BooksToscrapeSpider"
+    assert spider_cls.name == "books_toscrape"
+    assert Args in spider_cls.__mro__
+    spider = get_spider(spider_cls, kwargs={"pages": "2", "tags": "a,b"})
+    assert spider.args.pages == 2
+    assert spider.args.query == "books"
+    assert spider.args.tags == ["a", "b"]
+    assert get_spider(spider_cls, kwargs={"pages": "1"}).args.tags == []
+    error_type = ParamValidationError if use_dataclass else ValueError
+    with pytest.raises(error_type):
+        get_spider(spider_cls)
+
+
+@pytest.mark.parametrize("use_dataclass", [False, True])
+def test_pooling(use_dataclass):
+    params = {"pages": int, "query": (str, "books")}
+    spider_cls1 = create_spider_class("a", params, use_dataclass=use_dataclass)
+    spider_cls2 = create_spider_class("b", params, use_dataclass=use_dataclass)
+    spider_cls3 = create_spider_class(
+        "c", {"pages": int, "query": (str, "movies")}, use_dataclass=use_dataclass
+    )
+    spider_cls4 = create_spider_class(
+        "d", {"pages": (int, 1), "query": (str, "books")}, use_dataclass=use_dataclass
+    )
+    assert get_param_model(spider_cls1) is get_param_model(spider_cls2)
+    assert get_param_model(spider_cls1) is not get_param_model(spider_cls3)
+    assert get_param_model(spider_cls1) is not get_param_model(spider_cls4)
+    assert _get_param_spec(spider_cls1) is _get_param_spec(spider_cls2)
+    assert _get_param_spec(spider_cls1) is not _get_param_spec(spider_cls3)
+
+
+def test_pooling_bool_default():
+    spider_cls1 = create_spider_class("a", {"value": (int, 1)}, use_dataclass=True)
+    spider_cls2 = create_spider_class("b", {"value": (int, True)}, use_dataclass=True)
+    assert get_param_model(spider_cls1) is not get_param_model(spider_cls2)
+
+
+def test_param_model():
+    spider_cls = create_spider_class("books", Params)
+    assert get_param_model(spider_cls) is Params
+    assert get_spider(spider_cls, kwargs={"pages": "1"}).args == Params(pages=1)
+
+
+@pytest.mark.parametrize("use_dataclass", [False, True])
+def test_schema(use_dataclass):
+    if USING_PYDANTIC_1 and not use_dataclass:
+        pytest.skip("Pydantic 1.x generates a different schema for Optional")
+    spider_cls = create_spider_class(
+        "books", schema=EXPECTED_SCHEMA, use_dataclass=use_dataclass
+    )
+    expected = {k: v for k, v in EXPECTED_SCHEMA.items() if k != "description"}
+    assert spider_cls.get_param_schema(normalize=True) == expected
+    spider = get_spider(spider_cls, kwargs={"pages": "1", "sort": "desc"})
+    assert spider.args.sort == "desc"
+    assert spider.args.tags == []
+
+
+def test_schema_extra():
+    schema = {
+        "properties": {
+            "pages": {"type": "integer", "widget": "slider"},
+            "query": {"type": "string"},
+        },
+        "required": ["pages"],
+    }
+    spider_cls = create_spider_class("books", schema=schema, use_dataclass=True)
+    assert spider_cls.get_param_schema(normalize=True)["properties"] == {
+        "pages": {"title": "Pages", "type": "integer", "widget": "slider"},
+        "query": {
+            "anyOf": [{"type": "string"}, {"type": "null"}],
+            "default": None,
+            "title": "Query",
+        },
+    }
+
+
+def test_schema_constraints():
+    schema = {
+        "properties": {
+            "pages": {"type": "integer", "minimum": 1, "exclusiveMaximum": 10},
+            "query": {
+                "anyOf": [
+                    {"type": "string", "minLength": 2, "pattern": "^[a-z]+$"},
+                    {"type": "null"},
+                ],
+                "default": None,
+            },
+            "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 1},
+        },
+        "required": ["pages"],
+    }
+    spider_cls = create_spider_class("books", schema=schema)
+    spider = get_spider(spider_cls, kwargs={"pages": "9", "query": "ab", "tags": ["a"]})
+    assert spider.args.pages == 9
+    for kwargs in (
+        {"pages": "0"},
+        {"pages": "10"},
+        {"pages": "1", "query": "a"},
+        {"pages": "1", "query": "AB"},
+        {"pages": "1", "tags": ["a", "b"]},
+    ):
+        with pytest.raises(ValueError):  # noqa: PT011
+            get_spider(spider_cls, kwargs=kwargs)
+    properties = spider_cls.get_param_schema(normalize=True)["properties"]
+    assert properties["pages"]["minimum"] == 1
+    assert properties["pages"]["exclusiveMaximum"] == 10
+    assert properties["tags"]["maxItems"] == 1
+
+
+def test_schema_constraints_dataclass():
+    schema = {"properties": {"pages": {"type": "integer", "minimum": 1}}}
+    with pytest.raises(ValueError, match="do not support validation constraints"):
+        create_spider_class("books", schema=schema, use_dataclass=True)
+
+
+@pytest.mark.parametrize(
+    ("schema", "message"),
+    [
+        ({"properties": {"a": {"type": "object"}}}, "Unsupported type 'object'"),
+        (
+            {
+                "properties": {
+                    "a": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "uniqueItems": True,
+                    }
+                }
+            },
+            "Unsupported keyword 'uniqueItems' in the schema of 'a'",
+        ),
+        (
+            {
+                "properties": {
+                    "a": {"type": "array", "items": {"type": "integer", "minimum": 1}}
+                }
+            },
+            "Unsupported keyword 'minimum' in the items of 'a'",
+        ),
+        ({"properties": {"a": {"type": "array"}}}, "Missing items"),
+        (
+            {"properties": {"a": {"anyOf": [{"type": "integer"}, {"type": "string"}]}}},
+            "Unsupported anyOf",
+        ),
+    ],
+)
+def test_unsupported_schema(schema, message):
+    with pytest.raises(ValueError, match=message):
+        create_spider_class("books", schema=schema)
+
+
+def test_params_and_schema():
+    with pytest.raises(ValueError, match="either params or schema"):
+        create_spider_class("books", {"pages": int}, schema=EXPECTED_SCHEMA)
+
+
+def test_no_params():
+    spider_cls = create_spider_class(
+        "books",
+        metadata={"description": "Books."},
+        class_name="MyBooksSpider",
+        attrs={"start_urls": ["https://books.toscrape.com"]},
+    )
+    assert spider_cls.__name__ == "MyBooksSpider"
+    assert Args not in spider_cls.__mro__
+    assert spider_cls.start_urls == ["https://books.toscrape.com"]
+    assert get_spider_metadata(spider_cls) == {"description": "Books."}
+
+
+def test_base():
+    class BaseSpider(Spider):
+        custom_settings = {"ROBOTSTXT_OBEY": False}
+
+    spider_cls = create_spider_class("books", {"pages": int}, base=BaseSpider)
+    assert BaseSpider in spider_cls.__mro__
+    assert get_spider(spider_cls, kwargs={"pages": "1"}).args.pages == 1
+
+    class SubSpider(spider_cls):  # type: ignore[valid-type,misc]
+        name = "sub"
+
+    assert get_spider(SubSpider, kwargs={"pages": "2"}).args.pages == 2
+
+
+@pytest.mark.parametrize("use_dataclass", [False, True])
+def test_garbage_collection(use_dataclass):
+    spider_refs = []
+    model_refs = []
+    for index in range(50):
+        spider_cls = create_spider_class(
+            f"tenant_{index}",
+            {"pages": int, "query": (str, f"query {index}")},
+            use_dataclass=use_dataclass,
+        )
+        get_spider(spider_cls, kwargs={"pages": "1"})
+        get_spider_metadata(spider_cls, normalize=True)
+        spider_refs.append(weakref.ref(spider_cls))
+        model_refs.append(weakref.ref(get_param_model(spider_cls)))
+    del spider_cls
+    for _ in range(3):
+        gc.collect()
+    assert not any(ref() for ref in spider_refs)
+    assert not any(ref() for ref in model_refs)
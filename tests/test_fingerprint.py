@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import dataclasses
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from scrapy import Spider
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+
+from scrapy_spider_metadata import (
+    Args,
+    get_fingerprint_manifest,
+    get_spider_fingerprint,
+)
+from tests.test_extension import MetadataSpider, ParamSpider
+
+if TYPE_CHECKING:
+    import pytest
+
+
+class Sort(Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+@dataclasses.dataclass
+class Params:
+    pages: int
+    query: str = ""
+    sort: Sort = Sort.asc
+
+
+class DataclassParamSpider(Args[Params], Spider):
+    name = "dataclass_params"
+    metadata = {"title": "Books", "tags": ["books", "search"]}
+
+
+def test_snapshot() -> None:
+    # Fingerprints must only change when the metadata changes. Update these
+    # values only if the way fingerprints are computed changes on purpose,
+    # and bump FINGERPRINT_VERSION when doing so.
+    assert (
+        get_spider_fingerprint(DataclassParamSpider)
+        == "d4c4942ff89fbd1b364c17e2bd224beb2cdb05f59e69808478e56e1f60c5be53"
+    )
+    assert (
+        get_spider_fingerprint(MetadataSpider)
+        == "b6801d8e172cd28eca353aafe275601635f77044c7c2593fc74bc00560dd58af"
+    )
+
+
+def test_cached() -> None:
+    fingerprint = get_spider_fingerprint(DataclassParamSpider)
+    assert get_spider_fingerprint(DataclassParamSpider) is fingerprint
+
+
+def get_spider_cls(
+    default_query: str = "", tags: list[str] | None = None
+) -> type[Spider]:
+    @dataclasses.dataclass
+    class Params:
+        pages: int
+        query: str = default_query
+        sort: Sort = Sort.asc
+
+    class DataclassParamSpider(Args[Params], Spider):
+        name = "dataclass_params"
+        metadata = {"title": "Books", "tags": tags or ["books", "search"]}
+
+    return DataclassParamSpider
+
+
+def test_changes() -> None:
+    fingerprint = get_spider_fingerprint(DataclassParamSpider)
+    assert get_spider_fingerprint(get_spider_cls()) == fingerprint
+    fingerprints = {
+        get_spider_fingerprint(get_spider_cls(default_query="books")),
+        get_spider_fingerprint(get_spider_cls(tags=["search", "books"])),
+    }
+    assert fingerprint not in fingerprints
+    assert len(fingerprints) == 2
+
+
+def test_param_order() -> None:
+    def get_params() -> type:
+        @dataclasses.dataclass
+        class Params:
+            pages: int = 1
+            query: str = ""
+
+        return Params
+
+    def get_reordered_params() -> type:
+        @dataclasses.dataclass
+        class Params:
+            query: str = ""
+            pages: int = 1
+
+        return Params
+
+    class ParamSpider(Args[get_params()], Spider):  # type: ignore[misc]
+        name = "params"
+
+    class ReorderedParamSpider(Args[get_reordered_params()], Spider):  # type: ignore[misc]
+        name = "params"
+
+    assert get_spider_fingerprint(ParamSpider) != get_spider_fingerprint(
+        ReorderedParamSpider
+    )
+
+
+def test_canonical(monkeypatch: pytest.MonkeyPatch) -> None:
+    class ParamSpider(Spider):
+        name = "params"
+
+    class ReorderedParamSpider(Spider):
+        name = "params"
+
+    def get_metadata(anyof: list[dict[str, str]]) -> dict[str, Any]:
+        return {
+            "param_schema": {
+                "properties": {"key": {"anyOf": anyof, "title": "Key"}},
+                "type": "object",
+            }
+        }
+
+    metadata = {
+        ParamSpider: get_metadata([{"type": "integer"}, {"type": "string"}]),
+        ReorderedParamSpider: get_metadata([{"type": "string"}, {"type": "integer"}]),
+    }
+    monkeypatch.setattr(
+        "scrapy_spider_metadata._fingerprint._get_normalized_metadata",
+        metadata.__getitem__,
+    )
+    assert get_spider_fingerprint(ParamSpider) == get_spider_fingerprint(
+        ReorderedParamSpider
+    )
+    # The shared normalized metadata is not modified.
+    assert metadata[ReorderedParamSpider] == get_metadata(
+        [{"type": "string"}, {"type": "integer"}]
+    )
+
+
+def test_manifest() -> None:
+    spider_loader = SpiderLoader.from_settings(
+        Settings({"SPIDER_MODULES": ["tests.test_extension"]})
+    )
+    manifest = get_fingerprint_manifest(spider_loader)
+    assert manifest == {
+        "metadata": get_spider_fingerprint(MetadataSpider),
+        "params": get_spider_fingerprint(ParamSpider),
+    }
+    assert list(get_fingerprint_manifest([ParamSpider, MetadataSpider])) == [
+        "metadata",
+        "params",
+    ]
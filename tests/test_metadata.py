@@ -1,3 +1,5 @@
+from typing import Any
+
 from scrapy import Spider
 
 from scrapy_spider_metadata import Args, get_spider_metadata
@@ -76,3 +78,68 @@ def test_metadata_inheritance():
         "category": "Concrete spiders",
         "website": "CNN",
     }
+
+
+def test_metadata_merge():
+    class BaseSpider(Spider):
+        merge_metadata = True
+        metadata = {
+            "description": "Base spider.",
+            "category": "Base spiders",
+            "tags": {"language": "en", "region": {"continent": "Europe"}},
+            "urls": ["a"],
+        }
+
+    class MixinSpider(Spider):
+        metadata: dict[str, Any] = {"website": "Mixin"}
+
+    class NewsSpider(BaseSpider):
+        pass
+
+    class CNNSpider(NewsSpider, MixinSpider):
+        name = "my_spider"
+        metadata = {
+            "description": "CNN spider.",
+            "tags": {"topic": "news", "region": {"country": "US"}},
+            "urls": ["b"],
+        }
+
+    expected = {
+        "description": "CNN spider.",
+        "category": "Base spiders",
+        "tags": {
+            "language": "en",
+            "region": {"continent": "Europe", "country": "US"},
+            "topic": "news",
+        },
+        "urls": ["b"],
+        "website": "Mixin",
+    }
+    assert get_spider_metadata(CNNSpider) == expected
+    assert get_spider_metadata(CNNSpider) == expected
+    assert get_spider_metadata(NewsSpider) == BaseSpider.metadata
+    assert BaseSpider.metadata["tags"] == {
+        "language": "en",
+        "region": {"continent": "Europe"},
+    }
+
+    class UnmergedSpider(CNNSpider):
+        merge_metadata = False
+
+    assert get_spider_metadata(UnmergedSpider) == CNNSpider.metadata
+
+
+def test_metadata_merge_params():
+    class BaseSpider(Spider):
+        merge_metadata = True
+        metadata = {"category": "Base spiders"}
+
+    class MySpider(Args[Params], BaseSpider):
+        name = "my_spider"
+        metadata = {"description": "My spider."}
+
+    assert get_spider_metadata(MySpider) == {
+        "category": "Base spiders",
+        "description": "My spider.",
+        "param_schema": get_expected_schema(Params),
+    }
@@ -0,0 +1,361 @@
+"""Randomized checks of schema normalization.
+
+:class:`ModelGenerator` builds random parameter specification classes
+with enums, literals, unions, nested (reused and recursive) models, nested
+optionals, constraints and extra schema data, and the tests check invariants
+of their normalized schemas, and that the work and memory of normalization
+grow linearly with the number of parameters. Work is measured as executed
+lines of Python code rather than time, so that the tests do not depend on
+the load of the machine.
+
+Models are generated from fixed seeds, so failures are reproducible.
+"""
+
+import copy
+import json
+import math
+import random
+import sys
+import tracemalloc
+from collections.abc import Sequence
+from enum import Enum
+from time import perf_counter
+from types import FrameType
+from typing import Any, Callable, Literal, Optional, Union
+
+import pytest
+from pydantic import BaseModel, Field, create_model
+
+from scrapy_spider_metadata import (
+    compact_param_schema,
+    expand_param_schema,
+)
+from scrapy_spider_metadata._utils import (
+    _walk_schema,
+    canonicalize_param_schema,
+    normalize_param_schema,
+)
+
+from .test_params import USING_PYDANTIC_1, get_expected_schema
+
+# Number of fields of nested models.
+NESTED_SIZE = 4
+# Keys of the extra schema data of parameters.
+EXTRA_KEYS = ("widget", "x-group", "x-order")
+# Maximum growth exponent of normalization work and memory, i.e. 1 for
+# linear growth, with some margin.
+MAX_EXPONENT = 1.5
+# Numbers of parameters of the models used to measure growth.
+SCALING_SIZES = [100, 200, 400, 800]
+
+
+class Node(BaseModel):
+    value: int = 0
+    children: list["Node"] = []
+
+
+if USING_PYDANTIC_1:
+    Node.update_forward_refs()
+
+
+class ModelGenerator:
+    """Generator of random parameter specification classes.
+
+    :attr:`expected` maps the name of each generated model to the expected
+    properties of its fields in the normalized schema: whether it is
+    required, its enum values, if any, and its extra schema data.
+    """
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)  # noqa: S311
+        self.expected: dict[str, dict[str, dict[str, Any]]] = {}
+        self._enums: list[type[Enum]] = []
+        self._nested_models: list[type[BaseModel]] = []
+        self._models = 0
+
+    def _get_enum(self) -> type[Enum]:
+        # Reuse enums, so that definitions are referenced many times.
+        if self._enums and self.rng.random() < 0.7:
+            return self.rng.choice(self._enums)
+        values = [f"v{index}" for index in range(self.rng.randint(1, 6))]
+        enum = Enum(  # type: ignore[misc]
+            f"Enum{len(self._enums)}", {value: value for value in values}, type=str
+        )
+        self._enums.append(enum)
+        return enum
+
+    def _get_field(self, depth: int) -> tuple[Any, dict[str, Any], Optional[list[str]]]:
+        """Return the annotation, the :func:`~pydantic.Field` arguments and
+        the enum values of a random field.
+        """
+        rng = self.rng
+        kinds = [
+            "scalar",
+            "constrained",
+            "enum",
+            "enum_list",
+            "optional_enum",
+            "literal",
+            "union",
+            "nested_optional",
+            "recursive",
+        ]
+        if depth < 2:
+            kinds += ["model", "optional_model"]
+        kind = rng.choice(kinds)
+        kwargs: dict[str, Any] = {}
+        required = rng.random() < 0.3
+        if kind in ("scalar", "constrained"):
+            annotation, default = rng.choice(
+                [(int, 1), (float, 1.5), (str, "a"), (bool, True)]
+            )
+            if kind == "constrained":
+                if annotation is str:
+                    kwargs["min_length"] = 1
+                elif annotation is not bool:
+                    kwargs.update(ge=0, le=100)
+            if not required:
+                kwargs["default"] = default
+            return annotation, kwargs, None
+        if kind in ("enum", "enum_list", "optional_enum"):
+            enum = self._get_enum()
+            values = [member.value for member in enum]
+            if kind == "enum_list":
+                kwargs["default_factory"] = list
+                return list[enum], kwargs, values  # type: ignore[valid-type]
+            if kind == "optional_enum":
+                kwargs["default"] = None
+                return Optional[enum], kwargs, values
+            if not required:
+                kwargs["default"] = next(iter(enum))
+            return enum, kwargs, values
+        if kind == "literal":
+            values = ["x", "y", "z"][: rng.randint(1, 3)]
+            if not required:
+                kwargs["default"] = values[0]
+            return Literal[tuple(values)], kwargs, values
+        if kind == "union":
+            kwargs["default"] = 0
+            return Union[int, str], kwargs, None
+        if kind == "nested_optional":
+            kwargs["default"] = None
+            return Optional[list[Optional[int]]], kwargs, None
+        if kind == "recursive":
+            kwargs["default_factory"] = Node
+            return Node, kwargs, None
+        # Reuse nested models too, so that parameters share their type.
+        if self._nested_models and rng.random() < 0.5:
+            model = rng.choice(self._nested_models)
+        else:
+            model = self.generate(NESTED_SIZE, depth=depth + 1)
+            self._nested_models.append(model)
+        if kind == "optional_model":
+            kwargs["default"] = None
+            return Optional[model], kwargs, None
+        if not required:
+            kwargs["default_factory"] = model
+        return model, kwargs, None
+
+    def generate(self, size: int, *, depth: int = 0) -> type[BaseModel]:
+        """Return a random model with *size* fields."""
+        rng = self.rng
+        name = f"Model{self._models}"
+        self._models += 1
+        fields: dict[str, Any] = {}
+        expected: dict[str, dict[str, Any]] = {}
+        for index in range(size):
+            annotation, kwargs, enum = self._get_field(depth)
+            field_name = f"field_{index}"
+            if rng.random() < 0.3:
+                kwargs["description"] = f"Field {index}."
+            extra = {}
+            if rng.random() < 0.5:
+                extra = {key: index for key in rng.sample(EXTRA_KEYS, 2)}
+                if USING_PYDANTIC_1:
+                    kwargs.update(extra)
+                else:
+                    kwargs["json_schema_extra"] = extra
+            if "default" not in kwargs and "default_factory" not in kwargs:
+                kwargs["default"] = ...
+            fields[field_name] = (annotation, Field(**kwargs))
+            expected[field_name] = {
+                "required": kwargs.get("default") is ...,
+                "enum": enum,
+                "extra": extra,
+            }
+        self.expected[name] = expected
+        return create_model(name, **fields)
+
+
+def get_normalized_schema(param_model: type[BaseModel]) -> dict[str, Any]:
+    schema = get_expected_schema(param_model)
+    normalize_param_schema(schema)
+    return schema
+
+
+def shuffle_keys(value: Any, rng: random.Random, *, keep_order: bool = False) -> Any:
+    """Return a copy of *value* with the keys of its dicts shuffled, except
+    for property names.
+    """
+    if isinstance(value, dict):
+        items = list(value.items())
+        if not keep_order:
+            rng.shuffle(items)
+        return {
+            key: shuffle_keys(item, rng, keep_order=key == "properties")
+            for key, item in items
+        }
+    if isinstance(value, list):
+        return [shuffle_keys(item, rng) for item in value]
+    return value
+
+
+def get_enum(param: dict[str, Any]) -> Any:
+    param = param.get("items", param)
+    if "const" in param:  # Literal with a single value
+        return [param["const"]]
+    return param.get("enum")
+
+
+def check_invariants(schema: dict[str, Any], generator: ModelGenerator) -> None:
+    expected = generator.expected[schema["title"]]
+    assert list(schema["properties"]) == list(expected)
+    assert schema.get("required", []) == [
+        name for name, field in expected.items() if field["required"]
+    ]
+    for name, param in schema["properties"].items():
+        field = expected[name]
+        for key, value in field["extra"].items():
+            assert param[key] == value
+        if field["enum"] is not None:
+            assert field["enum"] == get_enum(param)
+
+    # Definitions are inlined, except for recursive ones.
+    refs = set()
+    for name, node in _walk_schema(schema):
+        assert not {"allOf", "definitions", "json_schema_extra"} & set(node)
+        if name is not None:
+            assert "title" in node
+        if "$ref" in node:
+            refs.add(node["$ref"])
+    assert refs <= {"#/$defs/Node"}
+    assert set(schema.get("$defs", {})) == {ref.rsplit("/")[-1] for ref in refs}
+
+    json.dumps(schema)
+    normalized_again = copy.deepcopy(schema)
+    normalize_param_schema(normalized_again)
+    assert normalized_again == schema
+    assert expand_param_schema(compact_param_schema(schema)) == schema
+
+    canonical = copy.deepcopy(schema)
+    canonicalize_param_schema(canonical)
+    assert canonical == schema
+    canonical_again = copy.deepcopy(canonical)
+    canonicalize_param_schema(canonical_again)
+    assert json.dumps(canonical_again) == json.dumps(canonical)
+    shuffled = shuffle_keys(schema, generator.rng)
+    canonicalize_param_schema(shuffled)
+    assert json.dumps(shuffled) == json.dumps(canonical)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_invariants(seed):
+    generator = ModelGenerator(seed)
+    param_model = generator.generate(generator.rng.randint(1, 40))
+    check_invariants(get_normalized_schema(param_model), generator)
+
+
+def get_growth_exponent(sizes: list[int], values: Sequence[float]) -> float:
+    """Return the slope of the least-squares fit of *values* against *sizes*
+    on a log-log scale, i.e. 1 for linear growth and 2 for quadratic growth.
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(value) for value in values]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum(
+        (x - mean_x) ** 2 for x in xs
+    )
+
+
+def measure(func: Callable[[dict[str, Any]], Any], schema: dict[str, Any]) -> float:
+    """Return the time of *func* on a copy of *schema*."""
+    schema = copy.deepcopy(schema)
+    start_time = perf_counter()
+    func(schema)
+    return perf_counter() - start_time
+
+
+def count_lines(func: Callable[[dict[str, Any]], Any], schema: dict[str, Any]) -> int:
+    """Return the number of lines of Python code that *func* executes on a
+    copy of *schema*, a measure of its work that, unlike time, does not
+    depend on the load of the machine.
+    """
+    schema = copy.deepcopy(schema)
+    count = 0
+
+    def trace(frame: FrameType, event: str, arg: Any) -> Any:
+        nonlocal count
+        count += 1
+        return trace
+
+    # Restored afterwards, e.g. for coverage.
+    previous_trace = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        func(schema)
+    finally:
+        sys.settrace(previous_trace)
+    return count
+
+
+def measure_memory(
+    func: Callable[[dict[str, Any]], Any], schema: dict[str, Any]
+) -> float:
+    """Return the peak memory allocated by *func* on a copy of *schema*."""
+    schema = copy.deepcopy(schema)
+    tracemalloc.start()
+    try:
+        func(schema)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture(scope="module")
+def scaling_schemas() -> dict[str, list[dict[str, Any]]]:
+    """Return the raw and normalized schemas of random models of
+    :data:`SCALING_SIZES` parameters.
+    """
+    generator = ModelGenerator(0)
+    schemas = [get_expected_schema(generator.generate(size)) for size in SCALING_SIZES]
+    normalized_schemas = copy.deepcopy(schemas)
+    for schema in normalized_schemas:
+        normalize_param_schema(schema)
+    return {"raw": schemas, "normalized": normalized_schemas}
+
+
+@pytest.mark.parametrize(
+    ("func", "input_schemas"),
+    [
+        (normalize_param_schema, "raw"),
+        (canonicalize_param_schema, "normalized"),
+        (compact_param_schema, "normalized"),
+    ],
+)
+def test_scaling(func, input_schemas, scaling_schemas, record_property):
+    sizes = SCALING_SIZES
+    schemas = scaling_schemas[input_schemas]
+    lines = [count_lines(func, schema) for schema in schemas]
+    memory = [measure_memory(func, schema) for schema in schemas]
+    # Times are only recorded, not checked, since they depend on the load of
+    # the machine.
+    times = [measure(func, schema) for schema in schemas]
+    for size, line_count, peak, time in zip(sizes, lines, memory, times):
+        record_property(
+            f"{size} parameters",
+            f"{line_count} lines, {peak} B, {time * 1e3:.2f} ms",
+        )
+    lines_exponent = get_growth_exponent(sizes, lines)
+    memory_exponent = get_growth_exponent(sizes, memory)
+    assert lines_exponent < MAX_EXPONENT, f"Super-linear work: {lines}"
+    assert memory_exponent < MAX_EXPONENT, f"Super-linear memory: {memory}"
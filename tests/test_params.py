@@ -1,5 +1,6 @@
+import json
 from enum import Enum, IntEnum
-from typing import TYPE_CHECKING, Any, Optional, cast
+from typing import TYPE_CHECKING, Annotated, Any, Literal, Optional, Union, cast
 
 import pytest
 from packaging import version
@@ -7,7 +8,18 @@ from pydantic import BaseModel, Field, ValidationError
 from pydantic.version import VERSION as PYDANTIC_VERSION
 from scrapy import Spider
 
-from scrapy_spider_metadata import Args, get_spider_metadata
+from scrapy_spider_metadata import (
+    DEFAULT_NORMALIZATION_PASSES,
+    Args,
+    ArgsValidationResult,
+    compact_param_schema,
+    expand_param_schema,
+    get_spider_metadata,
+    hoist_json_schema_extra,
+    inline_refs,
+    remove_description,
+    remove_title,
+)
 
 from . import get_spider
 
@@ -640,6 +652,10 @@ def test_schema(normalize, expected_schema):
     schema = get_spider_metadata(ParamSpider, normalize=normalize)["param_schema"]
     assert schema == expected_schema
 
+    compact_schema = compact_param_schema(schema)
+    assert len(json.dumps(compact_schema)) < len(json.dumps(schema))
+    assert expand_param_schema(compact_schema) == expected_schema
+
 
 def test_validate(caplog):
     class Params(BaseModel):
@@ -755,3 +771,435 @@ def test_subclass_config_extension():
         "a": "b",
         "c": "d",
     }
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_dataclass():
+    from pydantic.dataclasses import dataclass
+
+    @dataclass
+    class Params:
+        foo: int
+        bar: list[str] = Field(default_factory=list)
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    class ModelParams(BaseModel):
+        foo: int
+        bar: list[str] = Field(default_factory=list)
+
+    class ModelParamSpider(Args[ModelParams], Spider):
+        name = "params"
+
+    spider = get_spider(ParamSpider, kwargs={"foo": "1", "bar": "a,b"})
+    assert isinstance(spider.args, Params)
+    assert spider.args.foo == 1
+    assert spider.args.bar == ["a", "b"]
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"foo": "a"})
+
+    expected_schema = ModelParamSpider.get_param_schema(normalize=True)
+    assert ParamSpider.get_param_schema(normalize=True) == {
+        **expected_schema,
+        "title": "Params",
+    }
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_typeddict():
+    from typing_extensions import NotRequired, TypedDict
+
+    class Params(TypedDict):
+        foo: int
+        bar: NotRequired[str]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    class ModelParams(BaseModel):
+        foo: int
+        bar: str
+
+    class ModelParamSpider(Args[ModelParams], Spider):
+        name = "params"
+
+    spider = get_spider(ParamSpider, kwargs={"foo": "1"})
+    assert spider.args == {"foo": 1}
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"bar": "a"})
+
+    expected_schema = ModelParamSpider.get_param_schema(normalize=True)
+    expected_schema["required"] = ["foo"]
+    assert ParamSpider.get_param_schema(normalize=True) == {
+        **expected_schema,
+        "title": "Params",
+    }
+
+
+def test_unsupported_param_spec():
+    class Params:
+        foo: int
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    with pytest.raises(TypeError):
+        ParamSpider.get_param_schema()
+    with pytest.raises(TypeError):
+        get_spider(ParamSpider, kwargs={"foo": "1"})
+
+
+def test_raw_args_as_attributes():
+    class Params(BaseModel):
+        foo: int
+        bar: int = Field(default=0, alias="baz")
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+        raw_args_as_attributes = False
+
+    spider = get_spider(ParamSpider, kwargs={"foo": "1", "baz": "2", "extra": "3"})
+    assert spider.args.foo == 1
+    assert spider.args.bar == 2
+    assert not hasattr(spider, "foo")
+    assert not hasattr(spider, "baz")
+    assert spider.extra == "3"  # type: ignore[attr-defined]
+
+
+def test_normalization_passes():
+    class FruitEnum(str, Enum):
+        pear = "pear"
+        banana = "banana"
+
+    class Params(BaseModel):
+        number: int = Field(
+            description="A number.", json_schema_extra={"foo": "bar"}, default=0
+        )
+        fruit: FruitEnum = Field(title="Fruit name", default=FruitEnum.pear)
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    def add_widget(name, param, context):
+        param["widget"] = "select" if "enum" in param else "input"
+
+    passes = [
+        hoist_json_schema_extra,
+        inline_refs,
+        remove_title,
+        remove_description,
+        add_widget,
+    ]
+    expected_schema = {
+        "properties": {
+            "number": {
+                "type": "integer",
+                "foo": "bar",
+                "default": 0,
+                "widget": "input",
+            },
+            "fruit": {
+                "type": "string",
+                "enum": ["pear", "banana"],
+                "default": "pear",
+                "widget": "select",
+            },
+        },
+        "title": "Params",
+        "type": "object",
+    }
+    assert ParamSpider.get_param_schema(normalize=True, passes=passes) == (
+        expected_schema
+    )
+    assert get_spider_metadata(ParamSpider, normalize=True, passes=passes) == {
+        "param_schema": expected_schema
+    }
+    assert ParamSpider.get_param_schema(
+        normalize=True, passes=DEFAULT_NORMALIZATION_PASSES
+    ) == ParamSpider.get_param_schema(normalize=True)
+    assert ParamSpider.get_param_schema(passes=passes) == ParamSpider.get_param_schema()
+
+    # Without inline_refs, references and their definitions are kept.
+    schema = ParamSpider.get_param_schema(normalize=True, passes=[remove_title])
+    defs_key = "definitions" if USING_PYDANTIC_1 else "$defs"
+    ref = (
+        schema["properties"]["fruit"].get("$ref")
+        or (schema["properties"]["fruit"]["allOf"][0]["$ref"])
+    )
+    assert ref == f"#/{defs_key}/FruitEnum"
+    assert schema[defs_key]["FruitEnum"]["enum"] == ["pear", "banana"]
+
+
+def test_nested_models():
+    class Color(str, Enum):
+        red = "red"
+        blue = "blue"
+
+    class Address(BaseModel):
+        city: str = Field(description="City name.")
+        color: Color = Color.red
+
+    class Node(BaseModel):
+        value: int = 0
+        children: list["Node"] = Field(default_factory=list)
+
+    class Params(BaseModel):
+        address: Address
+        colors: list[Color] = Field(default_factory=list)
+        root: Node = Field(default_factory=Node)
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    color_schema = {"type": "string", "enum": ["red", "blue"]}
+    assert ParamSpider.get_param_schema(normalize=True) == {
+        "properties": {
+            "address": {
+                "properties": {
+                    "city": {
+                        "description": "City name.",
+                        "title": "City",
+                        "type": "string",
+                    },
+                    "color": {**color_schema, "default": "red", "title": "Color"},
+                },
+                "required": ["city"],
+                "title": "Address",
+                "type": "object",
+            },
+            "colors": {
+                "items": color_schema,
+                "title": "Colors",
+                "type": "array",
+            },
+            "root": {"$ref": "#/$defs/Node", "title": "Root"},
+        },
+        "required": ["address"],
+        "title": "Params",
+        "type": "object",
+        "$defs": {
+            "Node": {
+                "properties": {
+                    "children": {
+                        "items": {"$ref": "#/$defs/Node"},
+                        "title": "Children",
+                        "type": "array",
+                    },
+                    "value": {"default": 0, "title": "Value", "type": "integer"},
+                },
+                "title": "Node",
+                "type": "object",
+            },
+        },
+    }
+
+
+def test_nested_models_not_shared():
+    class Color(str, Enum):
+        red = "red"
+        blue = "blue"
+
+    class Address(BaseModel):
+        color: Color = Color.red
+
+    class Params(BaseModel):
+        home: Address
+        work: Address
+        colors: list[Color] = Field(default_factory=list)
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    schema = ParamSpider.get_param_schema(normalize=True)
+    properties = schema["properties"]
+    assert properties["home"]["properties"] == properties["work"]["properties"]
+    # Modifying a parameter does not modify others of the same type.
+    properties["home"]["properties"]["color"]["title"] = "Home color"
+    assert properties["work"]["properties"]["color"]["title"] == "Color"
+    properties["home"]["properties"]["color"]["enum"].append("green")
+    assert properties["colors"]["items"]["enum"] == ["red", "blue"]
+
+
+def test_compact_nested_models():
+    class Color(str, Enum):
+        red = "red"
+        blue = "blue"
+
+    class Inner(BaseModel):
+        color: Color = Color.red
+
+    class Params(BaseModel):
+        a: Inner
+        b: Inner
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    schema = ParamSpider.get_param_schema(normalize=True)
+    compact_schema = compact_param_schema(schema)
+    assert compact_schema["$enums"] == [["red", "blue"]]
+    assert expand_param_schema(compact_schema) == schema
+
+
+def test_validate_args_batch():
+    class Color(str, Enum):
+        red = "red"
+        blue = "blue"
+
+    class Params(BaseModel):
+        pages: int = Field(ge=1)
+        color: Color = Color.red
+        tags: list[str] = []
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    columns = {
+        "pages": ["1", "0", "3", "a"],
+        "color": ["blue", "red", "green", "red"],
+        "tags": ["a,b", "", "c", "[]"],
+    }
+    expected_args = [
+        Params(pages=1, color=Color.blue, tags=["a", "b"]),
+        None,
+        None,
+        None,
+    ]
+    expected_locs = [None, [("pages",)], [("color",)], [("pages",)]]
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    for args in (columns, rows, iter(rows)):
+        results = ParamSpider.validate_args_batch(args)
+        assert [result.args for result in results] == expected_args
+        assert [
+            None
+            if result.errors is None
+            else [tuple(error["loc"]) for error in result.errors]
+            for result in results
+        ] == expected_locs
+
+    results = ParamSpider.validate_args_batch({"pages": ["1", "2"]})
+    assert results == [
+        ArgsValidationResult(Params(pages=1), None),
+        ArgsValidationResult(Params(pages=2), None),
+    ]
+    assert ParamSpider.validate_args_batch([]) == []
+
+    with pytest.raises(ValueError, match="same length"):
+        ParamSpider.validate_args_batch({"pages": ["1"], "color": []})
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_validate_args_batch_validators():
+    from pydantic import AfterValidator, field_validator, model_validator
+
+    calls: list[Any] = []
+
+    def record(value: Any) -> Any:
+        calls.append(value)
+        return value
+
+    class ModelValidatorParams(BaseModel):
+        pages: int = Field(ge=1)
+
+        @model_validator(mode="after")
+        def record(self):
+            calls.append(self.pages)
+            return self
+
+    class Nested(BaseModel):
+        pages: int = Field(ge=1)
+
+        @field_validator("pages")
+        @classmethod
+        def record(cls, value):
+            calls.append(value)
+            return value
+
+    class NestedParams(BaseModel):
+        nested: Optional[list[Nested]] = None
+
+    class AnnotatedParams(BaseModel):
+        pages: Annotated[int, Field(ge=1), AfterValidator(record)]
+
+    for params, rows in (
+        (ModelValidatorParams, [{"pages": "1"}, {"pages": "0"}, {"pages": "3"}]),
+        (
+            NestedParams,
+            [
+                {"nested": [{"pages": 1}]},
+                {"nested": [{"pages": 0}]},
+                {"nested": [{"pages": 3}]},
+            ],
+        ),
+        (AnnotatedParams, [{"pages": "1"}, {"pages": "0"}, {"pages": "3"}]),
+    ):
+
+        class ParamSpider(Args[params], Spider):  # type: ignore[valid-type]
+            name = "params"
+
+        calls.clear()
+        results = ParamSpider.validate_args_batch(rows)
+        assert [result.errors is None for result in results] == [True, False, True]
+        assert calls == [1, 3]
+
+
+def test_canonical_schema():
+    class Sort(str, Enum):
+        asc = "asc"
+        desc = "desc"
+
+    class Filter(BaseModel):
+        min_price: float = 1.5
+        category: str = "books"
+
+    class Params(BaseModel):
+        """Search parameters."""
+
+        pages: int = Field(description="Number of pages.", ge=1)
+        sort: Sort = Sort.asc
+        key: Union[str, int] = 0
+        limit: Optional[int] = None
+        mode: Literal["a", "b"] = "a"
+        filter: Filter = Filter()
+        sorts: list[Sort] = []
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    if USING_PYDANTIC_1:
+        # Pydantic 1.x does not declare None as a valid or default value.
+        limit = '"limit": {"title": "Limit", "type": "integer"}, '
+    else:
+        limit = (
+            '"limit": {"anyOf": [{"type": "integer"}, {"type": "null"}], '
+            '"default": null, "title": "Limit"}, '
+        )
+    # Otherwise byte-identical with Pydantic 1.x and 2.x.
+    expected = (
+        '{"description": "Search parameters.", "properties": {'
+        '"pages": {"description": "Number of pages.", "minimum": 1, '
+        '"title": "Pages", "type": "integer"}, '
+        '"sort": {"default": "asc", "enum": ["asc", "desc"], "title": "Sort", '
+        '"type": "string"}, '
+        '"key": {"anyOf": [{"type": "integer"}, {"type": "string"}], '
+        '"default": 0, "title": "Key"}, '
+        f"{limit}"
+        '"mode": {"default": "a", "enum": ["a", "b"], "title": "Mode", '
+        '"type": "string"}, '
+        '"filter": {"default": {"category": "books", "min_price": 1.5}, '
+        '"properties": {"min_price": {"default": 1.5, "title": "Min Price", '
+        '"type": "number"}, "category": {"default": "books", '
+        '"title": "Category", "type": "string"}}, "title": "Filter", '
+        '"type": "object"}, '
+        '"sorts": {"default": [], "items": {"enum": ["asc", "desc"], '
+        '"type": "string"}, "title": "Sorts", "type": "array"}}, '
+        '"required": ["pages"], "title": "Params", "type": "object"}'
+    )
+    schema = ParamSpider.get_param_schema(normalize=True, canonical=True)
+    assert json.dumps(schema) == expected
+    metadata = get_spider_metadata(ParamSpider, normalize=True, canonical=True)
+    assert json.dumps(metadata["param_schema"]) == expected
+    raw_schema = ParamSpider.get_param_schema(canonical=True)
+    assert list(raw_schema) == sorted(raw_schema)
+    assert list(raw_schema["properties"]) == list(schema["properties"])
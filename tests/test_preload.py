@@ -0,0 +1,42 @@
+from scrapy import Spider
+from scrapy.settings import Settings
+from scrapy.spiderloader import SpiderLoader
+
+from scrapy_spider_metadata import Args, get_spider_metadata, preload
+from tests.test_params import Params
+
+
+def test_preload_classes() -> None:
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    class MetadataSpider(Spider):
+        name = "metadata"
+        metadata = {"description": "Spider without parameters."}
+
+    timings = preload([ParamSpider, MetadataSpider])
+    assert list(timings) == [ParamSpider, MetadataSpider]
+    assert all(isinstance(timing, float) for timing in timings.values())
+
+
+def test_preload_spider_loader() -> None:
+    spider_loader = SpiderLoader.from_settings(
+        Settings({"SPIDER_MODULES": ["tests.test_extension"]})
+    )
+    timings = preload(spider_loader)
+    assert {spider_cls.name for spider_cls in timings} == {"params", "metadata"}
+
+
+def test_cached_schema_copy() -> None:
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    preload([ParamSpider])
+    schema = ParamSpider.get_param_schema(normalize=True)
+    schema["properties"]["foo"]["title"] = "Changed"
+    schema["properties"].clear()
+    assert ParamSpider.get_param_schema(normalize=True)["properties"]
+    assert (
+        ParamSpider.get_param_schema(normalize=True)
+        == get_spider_metadata(ParamSpider, normalize=True)["param_schema"]
+    )
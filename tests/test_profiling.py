@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args, get_spider_metadata
+from scrapy_spider_metadata._profiling import ENV_VAR, Profiler
+from tests.test_extension import open_spider
+from tests.test_params import Params
+
+from . import get_spider
+
+
+@pytest.fixture
+def profiler(monkeypatch: pytest.MonkeyPatch) -> Profiler:
+    profiler = Profiler()
+    monkeypatch.setattr("scrapy_spider_metadata._profiling.PROFILER", profiler)
+    return profiler
+
+
+def test_profile(profiler: Profiler) -> None:
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    get_spider(ParamSpider, kwargs={"foo": "1"})
+    get_spider(ParamSpider, kwargs={"foo": "2"})
+    get_spider_metadata(ParamSpider, normalize=True)
+    stats = profiler.get_stats(ParamSpider)
+    assert {stage: values["count"] for stage, values in stats.items()} == {
+        "get_generic_param": 1,
+        "build_param_spec": 1,
+        "get_args": 2,
+        "validate_args": 2,
+        "get_spider_metadata": 1,
+        "get_param_schema": 1,
+        "json_schema": 1,
+        "normalize_param_schema": 1,
+    }
+    assert all(values["time"] >= 0 for values in stats.values())
+    report = profiler.report()
+    assert "test_profile.<locals>.ParamSpider\n  get_generic_param " in report
+
+
+def test_profile_disabled() -> None:
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    get_spider(ParamSpider, kwargs={"foo": "1"})
+    assert Profiler().get_stats(ParamSpider) == {}
+
+
+def test_profile_stats(profiler: Profiler) -> None:
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    stats = open_spider(ParamSpider, kwargs={"foo": "1"})
+    assert stats["spider_metadata/profile/validate_args/count"] == 1
+    assert isinstance(stats["spider_metadata/profile/validate_args/time"], float)
+
+
+def test_profile_report() -> None:
+    code = (
+        "from scrapy import Spider\n"
+        "from scrapy_spider_metadata import Args\n"
+        "from tests.test_params import Params\n"
+        "class ParamSpider(Args[Params], Spider):\n"
+        "    name = 'params'\n"
+        "ParamSpider(foo='1')\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        env={**os.environ, ENV_VAR: "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stderr.startswith("scrapy-spider-metadata profile")
+    assert "__main__.ParamSpider\n  get_generic_param " in result.stderr
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from weakref import WeakKeyDictionary
+
+import pytest
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args
+from scrapy_spider_metadata._params import _ParamSpec
+from scrapy_spider_metadata._schema_cache import ENV_VAR, SchemaCacheFile, get_cache_key
+
+from . import test_params, test_validation
+
+SPIDERS = [test_params.ParamSpider, test_validation.ParamSpider]
+
+
+def use_cache(monkeypatch: pytest.MonkeyPatch, path: Path) -> SchemaCacheFile:
+    """Use a schema cache at *path*, with no parameter specification built,
+    as a new process would.
+    """
+    cache = SchemaCacheFile(path)
+    monkeypatch.setattr("scrapy_spider_metadata._schema_cache.SCHEMA_CACHE", cache)
+    monkeypatch.setattr(
+        "scrapy_spider_metadata._params._PARAM_SPECS", WeakKeyDictionary()
+    )
+    return cache
+
+
+@pytest.mark.parametrize("spider_cls", SPIDERS)
+def test_shared(spider_cls, tmp_path, monkeypatch):
+    path = tmp_path / "schemas"
+    use_cache(monkeypatch, path)
+    schema = spider_cls.get_param_schema()
+    normalized_schema = spider_cls.get_param_schema(normalize=True)
+    assert path.exists()
+
+    use_cache(monkeypatch, path)
+
+    def json_schema(self):
+        raise AssertionError("The schema was generated again")
+
+    monkeypatch.setattr(_ParamSpec, "json_schema", json_schema)
+    assert spider_cls.get_param_schema(normalize=True) == normalized_schema
+    assert spider_cls.get_param_schema() == schema
+
+
+def test_many_entries(tmp_path):
+    writer = SchemaCacheFile(tmp_path / "schemas")
+    reader = SchemaCacheFile(tmp_path / "schemas")
+    assert reader.get(b"a" * 64) is None
+    keys = [bytes([index]) * 64 for index in range(50)]
+    for index, key in enumerate(keys):
+        writer.set(key, {"index": index})
+        assert reader.get(key) == {"index": index}
+    assert [reader.get(key) for key in keys] == [{"index": i} for i in range(50)]
+    assert reader.get(b"a" * 64) is None
+
+
+def test_not_json_serializable(tmp_path):
+    cache = SchemaCacheFile(tmp_path / "schemas")
+    cache.set(b"a" * 64, {"a": object()})
+    assert cache.get(b"a" * 64) is None
+
+
+def test_invalid_file(tmp_path, monkeypatch):
+    path = tmp_path / "schemas"
+    path.write_bytes(b"invalid")
+    cache = use_cache(monkeypatch, path)
+    spider_cls = test_params.ParamSpider
+    schema = spider_cls.get_param_schema()
+    key = get_cache_key(spider_cls, test_params.Params)
+    assert key is not None
+    assert cache.get(key) == [schema, spider_cls.get_param_schema(normalize=True)]
+
+
+def test_truncated_file(tmp_path, monkeypatch):
+    path = tmp_path / "schemas"
+    use_cache(monkeypatch, path)
+    spider_cls = test_params.ParamSpider
+    schema = spider_cls.get_param_schema()
+    key = get_cache_key(spider_cls, test_params.Params)
+    assert key is not None
+    path.write_bytes(path.read_bytes()[:-10])
+    cache = use_cache(monkeypatch, path)
+    assert cache.get(key) is None
+    assert spider_cls.get_param_schema() == schema
+    # The entry is written again.
+    assert cache.get(key) == [schema, spider_cls.get_param_schema(normalize=True)]
+
+
+def test_corrupt_entry(tmp_path):
+    path = tmp_path / "schemas"
+    cache = SchemaCacheFile(path)
+    cache.set(b"a" * 64, {"a": 1})
+    cache.set(b"b" * 64, {"b": 2})
+    data = path.read_bytes()
+    path.write_bytes(data.replace(b'{"a":1}', b'{"a":1"'))
+    cache = SchemaCacheFile(path)
+    assert cache.get(b"a" * 64) is None
+    assert cache.get(b"b" * 64) == {"b": 2}
+    cache.set(b"c" * 64, {"c": 3})
+    assert b'{"a":1"' not in path.read_bytes()
+    assert [cache.get(key * 64) for key in (b"a", b"b", b"c")] == [
+        None,
+        {"b": 2},
+        {"c": 3},
+    ]
+
+
+def test_replaced_entries(tmp_path):
+    cache = SchemaCacheFile(tmp_path / "schemas")
+    old_key, new_key, other_key = b"a" * 64, b"a" * 32 + b"b" * 32, b"b" * 64
+    cache.set(old_key, {"version": 1})
+    cache.set(other_key, {"other": 1})
+    cache.set(new_key, {"version": 2})
+    assert cache.get(old_key) is None
+    assert cache.get(new_key) == {"version": 2}
+    assert cache.get(other_key) == {"other": 1}
+    cache.set(new_key, {"version": 3})
+    assert cache.get(new_key) == {"version": 3}
+    assert b'"version":2' not in (tmp_path / "schemas").read_bytes()
+
+
+def test_write_error(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "schemas"
+    cache = SchemaCacheFile(path)
+
+    def replace(self, target):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(Path, "replace", replace)
+    cache.set(b"a" * 64, {"a": 1})
+    assert "No space left on device" in caplog.text
+    assert sorted(child.name for child in tmp_path.iterdir()) == ["schemas.lock"]
+
+
+def test_not_importable(tmp_path, monkeypatch):
+    path = tmp_path / "schemas"
+    use_cache(monkeypatch, path)
+
+    class ParamSpider(Args[test_params.Params], Spider):
+        name = "params"
+
+    assert get_cache_key(ParamSpider, test_params.Params) is None
+    ParamSpider.get_param_schema()
+    assert not path.exists()
+
+
+def test_source_change(tmp_path, monkeypatch):
+    module_path = tmp_path / "schema_cache_spiders.py"
+    module_path.write_text(
+        "from scrapy import Spider\n"
+        "from scrapy_spider_metadata import Args\n"
+        "from tests.test_params import Params\n"
+        "class ParamSpider(Args[Params], Spider):\n"
+        "    name = 'params'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from schema_cache_spiders import ParamSpider  # type: ignore[import-not-found]
+
+    key = get_cache_key(ParamSpider, test_params.Params)
+    assert key is not None
+    assert get_cache_key(ParamSpider, test_params.Params) == key
+    stat = module_path.stat()
+    os.utime(module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    new_key = get_cache_key(ParamSpider, test_params.Params)
+    assert new_key is not None
+    assert new_key != key
+    # Same group, so that the new entry replaces the old one.
+    assert new_key[:32] == key[:32]
+    del sys.modules["schema_cache_spiders"]
+
+
+def test_processes(tmp_path):
+    code = """
+from scrapy_spider_metadata import get_spider_metadata
+from tests.test_params import ParamSpider
+
+get_spider_metadata(ParamSpider, normalize=True)
+"""
+    env = {
+        **os.environ,
+        ENV_VAR: str(tmp_path / "schemas"),
+        "SCRAPY_SPIDER_METADATA_PROFILE": "1",
+        "PYTHONPATH": os.pathsep.join(
+            filter(
+                None, [str(Path(__file__).parent.parent), os.environ.get("PYTHONPATH")]
+            )
+        ),
+    }
+    reports = [
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stderr
+        for _ in range(2)
+    ]
+    assert "json_schema" in reports[0]
+    assert "get_param_schema" in reports[1]
+    assert "json_schema" not in reports[1]
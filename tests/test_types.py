@@ -0,0 +1,52 @@
+import pytest
+from pydantic import BaseModel, ValidationError
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args, FileLines
+
+from . import get_spider
+from .test_params import USING_PYDANTIC_1
+
+
+class Params(BaseModel):
+    urls: FileLines
+
+
+class ParamSpider(Args[Params], Spider):
+    name = "params"
+
+
+def test_file_lines(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text(" https://a.example \n\nhttps://b.example\r\n", encoding="utf-8")
+    spider = get_spider(ParamSpider, kwargs={"urls": str(path)})
+    assert spider.args.urls == FileLines(path)
+    assert spider.args.urls.path == path
+    assert list(spider.args.urls) == ["https://a.example", "https://b.example"]
+    # Iterating again reads the file again.
+    path.write_text("https://c.example", encoding="utf-8")
+    assert list(spider.args.urls) == ["https://c.example"]
+
+
+def test_file_lines_missing(tmp_path):
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"urls": str(tmp_path / "missing.txt")})
+    with pytest.raises(ValidationError):
+        get_spider(ParamSpider, kwargs={"urls": str(tmp_path)})
+
+
+def test_file_lines_schema():
+    assert ParamSpider.get_param_schema(normalize=True) == {
+        "properties": {"urls": {"title": "Urls", "type": "string"}},
+        "required": ["urls"],
+        "title": "Params",
+        "type": "object",
+    }
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_file_lines_serialization(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.touch()
+    params = Params(urls=FileLines(path))
+    assert params.model_dump(mode="json") == {"urls": str(path)}
@@ -1,8 +1,14 @@
-from typing import Generic, TypeVar
+import json
+from typing import Any, Generic, TypeVar
 
 import pytest
 
-from scrapy_spider_metadata._utils import get_generic_param
+from scrapy_spider_metadata import compact_param_schema, expand_param_schema
+from scrapy_spider_metadata._utils import (
+    canonicalize_param_schema,
+    get_generic_param,
+    normalize_param_schema,
+)
 
 ItemT = TypeVar("ItemT")
 
@@ -71,3 +77,184 @@ class SpecializedTwoGenerics(MyGeneric2[Item2], BaseSpecialized):
 )
 def test_get_generic_param(cls: type, param: type) -> None:
     assert get_generic_param(cls, expected=MyGeneric) == param
+
+
+def test_normalize_param_schema_mutual_recursion() -> None:
+    schema = {
+        "properties": {
+            "a": {"anyOf": [{"$ref": "#/$defs/A"}, {"type": "null"}]},
+            "leaf": {"$ref": "#/$defs/Leaf"},
+        },
+        "$defs": {
+            "A": {"properties": {"b": {"$ref": "#/$defs/B"}}, "type": "object"},
+            "B": {
+                "properties": {
+                    "a": {"$ref": "#/$defs/A"},
+                    "leaf": {"$ref": "#/$defs/Leaf"},
+                },
+                "type": "object",
+            },
+            "Leaf": {"title": "Leaf", "type": "string", "enum": ["x"]},
+            "Unused": {"type": "string"},
+        },
+    }
+    normalize_param_schema(schema)
+    assert schema == {
+        "properties": {
+            "a": {
+                "anyOf": [{"$ref": "#/$defs/A"}, {"type": "null"}],
+                "title": "A",
+            },
+            "leaf": {"enum": ["x"], "title": "Leaf", "type": "string"},
+        },
+        "$defs": {
+            "A": {
+                "properties": {"b": {"$ref": "#/$defs/B", "title": "B"}},
+                "type": "object",
+            },
+            "B": {
+                "properties": {
+                    "a": {"$ref": "#/$defs/A", "title": "A"},
+                    "leaf": {"enum": ["x"], "title": "Leaf", "type": "string"},
+                },
+                "type": "object",
+            },
+        },
+    }
+
+
+def test_compact_param_schema() -> None:
+    color = {"enum": ["red", "blue"], "type": "string"}
+    schema: dict[str, Any] = {
+        "properties": {
+            "max_pages": {"title": "Max Pages", "type": "integer"},
+            "color": {**color, "title": "Main color"},
+            "colors": {"items": color, "title": "Colors", "type": "array"},
+            "size": {"enum": ["s", "m"], "type": "string"},
+            "address": {
+                "properties": {"title": {"title": "Title", "type": "string"}},
+                "title": "Address",
+                "type": "object",
+            },
+        },
+        "title": "Params",
+        "type": "object",
+    }
+    compact_schema = compact_param_schema(schema)
+    assert compact_schema == {
+        "$compact": 1,
+        "$enums": [["red", "blue"]],
+        "properties": {
+            "max_pages": {"type": "integer"},
+            "color": {"$enum": 0, "title": "Main color", "type": "string"},
+            "colors": {"items": {"$enum": 0, "type": "string"}, "type": "array"},
+            "size": {"enum": ["s", "m"], "title": None, "type": "string"},
+            "address": {
+                "properties": {"title": {"type": "string"}},
+                "type": "object",
+            },
+        },
+        "title": "Params",
+        "type": "object",
+    }
+    assert expand_param_schema(compact_schema) == schema
+    assert schema["properties"]["color"]["enum"] == ["red", "blue"]
+
+
+def test_compact_param_schema_shared_nodes() -> None:
+    color = {"enum": ["red", "blue"], "title": "Color", "type": "string"}
+    address = {"properties": {"color": color}, "type": "object"}
+    schema: dict[str, Any] = {
+        "properties": {"home": address, "work": address, "color": color},
+        "type": "object",
+    }
+    compact_schema = compact_param_schema(schema)
+    assert compact_schema == {
+        "$compact": 1,
+        "$enums": [["red", "blue"]],
+        "properties": {
+            "home": {
+                "properties": {"color": {"$enum": 0, "type": "string"}},
+                "title": None,
+                "type": "object",
+            },
+            "work": {
+                "properties": {"color": {"$enum": 0, "type": "string"}},
+                "title": None,
+                "type": "object",
+            },
+            "color": {"$enum": 0, "type": "string"},
+        },
+        "type": "object",
+    }
+    assert expand_param_schema(compact_schema) == schema
+
+
+def test_expand_param_schema_invalid() -> None:
+    with pytest.raises(ValueError, match="Unsupported compact schema version"):
+        expand_param_schema({"properties": {}})
+
+
+def test_canonicalize_param_schema() -> None:
+    schema = {
+        "type": "object",
+        "title": "Params",
+        "required": ["b", "a"],
+        "properties": {
+            "b": {"type": "string", "title": "B", "enum": ["y", "x"]},
+            "a": {
+                "title": "A",
+                "anyOf": [{"type": "null"}, {"$ref": "#/$defs/Z"}, {"type": "integer"}],
+                "default": {"y": 1, "x": [{"b": 1, "a": 2}]},
+            },
+        },
+        "$defs": {"Z": {"type": "string"}, "Y": {"type": "integer"}},
+    }
+    canonicalize_param_schema(schema)
+    assert json.dumps(schema) == json.dumps(
+        {
+            "$defs": {"Y": {"type": "integer"}, "Z": {"type": "string"}},
+            "properties": {
+                "b": {"enum": ["y", "x"], "title": "B", "type": "string"},
+                "a": {
+                    "anyOf": [
+                        {"$ref": "#/$defs/Z"},
+                        {"type": "integer"},
+                        {"type": "null"},
+                    ],
+                    "default": {"x": [{"a": 2, "b": 1}], "y": 1},
+                    "title": "A",
+                },
+            },
+            "required": ["b", "a"],
+            "title": "Params",
+            "type": "object",
+        }
+    )
+
+
+def test_normalize_param_schema_canonical() -> None:
+    pydantic1_schema = {
+        "title": "Params",
+        "type": "object",
+        "properties": {
+            "b": {"title": "B", "anyOf": [{"type": "string"}, {"type": "integer"}]},
+            "a": {"$ref": "#/definitions/A"},
+        },
+        "required": ["a", "b"],
+        "definitions": {"A": {"title": "A", "enum": ["x"], "type": "string"}},
+    }
+    pydantic2_schema = {
+        "$defs": {"A": {"enum": ["x"], "title": "A", "type": "string"}},
+        "properties": {
+            "b": {"anyOf": [{"type": "integer"}, {"type": "string"}], "title": "B"},
+            "a": {"$ref": "#/$defs/A"},
+        },
+        "required": ["b", "a"],
+        "title": "Params",
+        "type": "object",
+    }
+    normalize_param_schema(pydantic1_schema, canonical=True)
+    normalize_param_schema(pydantic2_schema, canonical=True)
+    assert json.dumps(pydantic1_schema) == json.dumps(pydantic2_schema)
+    assert list(pydantic1_schema["required"]) == ["b", "a"]
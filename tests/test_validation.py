@@ -0,0 +1,327 @@
+import dataclasses
+import pickle
+import subprocess
+import sys
+from enum import Enum
+from typing import Literal, Optional
+
+import pytest
+from pydantic import BaseModel, Field
+from scrapy import Spider
+
+from scrapy_spider_metadata import Args, FileLines, ParamValidationError
+from scrapy_spider_metadata._params import _get_param_spec
+
+from . import get_spider
+from .test_params import USING_PYDANTIC_1
+
+
+class Color(str, Enum):
+    red = "red"
+    blue = "blue"
+
+
+@dataclasses.dataclass
+class Params:
+    """Search parameters."""
+
+    pages: int
+    query: str = "books"
+    ratio: float = 0.5
+    strict: bool = False
+    color: Color = Color.red
+    max_items: Optional[int] = None
+    tags: list[str] = dataclasses.field(default_factory=list)
+    sort: Literal["asc", "desc"] = dataclasses.field(
+        default="asc", metadata={"description": "Sort order."}
+    )
+
+
+class ParamSpider(Args[Params], Spider):
+    name = "params"
+
+
+class ModelParams(BaseModel):
+    """Search parameters."""
+
+    pages: int
+    query: str = "books"
+    ratio: float = 0.5
+    strict: bool = False
+    color: Color = Color.red
+    max_items: Optional[int] = None
+    tags: list[str] = Field(default_factory=list)
+    sort: Literal["asc", "desc"] = Field(default="asc", description="Sort order.")
+
+
+class ModelParamSpider(Args[ModelParams], Spider):
+    name = "params"
+
+
+EXPECTED_SCHEMA = {
+    "description": "Search parameters.",
+    "properties": {
+        "pages": {"title": "Pages", "type": "integer"},
+        "query": {"default": "books", "title": "Query", "type": "string"},
+        "ratio": {"default": 0.5, "title": "Ratio", "type": "number"},
+        "strict": {"default": False, "title": "Strict", "type": "boolean"},
+        "color": {
+            "default": "red",
+            "enum": ["red", "blue"],
+            "type": "string",
+            "title": "Color",
+        },
+        "max_items": {
+            "anyOf": [{"type": "integer"}, {"type": "null"}],
+            "default": None,
+            "title": "Max Items",
+        },
+        "tags": {"items": {"type": "string"}, "title": "Tags", "type": "array"},
+        "sort": {
+            "default": "asc",
+            "description": "Sort order.",
+            "enum": ["asc", "desc"],
+            "title": "Sort",
+            "type": "string",
+        },
+    },
+    "required": ["pages"],
+    "title": "Params",
+    "type": "object",
+}
+
+
+def test_validate():
+    spider = get_spider(
+        ParamSpider,
+        kwargs={
+            "pages": "3",
+            "ratio": "0.25",
+            "strict": "yes",
+            "color": "blue",
+            "max_items": "10",
+            "tags": "a,b",
+        },
+    )
+    assert spider.args == Params(
+        pages=3,
+        ratio=0.25,
+        strict=True,
+        color=Color.blue,
+        max_items=10,
+        tags=["a", "b"],
+    )
+    assert _get_param_spec(ParamSpider).dump(spider.args) == {
+        "pages": 3,
+        "query": "books",
+        "ratio": 0.25,
+        "strict": True,
+        "color": "blue",
+        "max_items": 10,
+        "tags": ["a", "b"],
+        "sort": "asc",
+    }
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected_errors"),
+    [
+        (
+            {},
+            [{"type": "missing", "loc": ("pages",), "msg": "Field required"}],
+        ),
+        (
+            {"pages": "1.5", "color": "green", "tags": ["a", 1]},
+            [
+                {
+                    "type": "int_parsing",
+                    "loc": ("pages",),
+                    "msg": "Input should be a valid integer, unable to parse "
+                    "string as an integer",
+                },
+                {
+                    "type": "enum",
+                    "loc": ("color",),
+                    "msg": "Input should be 'red' or 'blue'",
+                },
+                {
+                    "type": "string_type",
+                    "loc": ("tags", 1),
+                    "msg": "Input should be a valid string",
+                },
+            ],
+        ),
+        (
+            {"pages": "1", "strict": "maybe", "sort": "up"},
+            [
+                {
+                    "type": "bool_parsing",
+                    "loc": ("strict",),
+                    "msg": "Input should be a valid boolean, unable to interpret input",
+                },
+                {
+                    "type": "literal_error",
+                    "loc": ("sort",),
+                    "msg": "Input should be 'asc' or 'desc'",
+                },
+            ],
+        ),
+    ],
+)
+def test_validate_errors(kwargs, expected_errors, caplog):
+    caplog.clear()
+    with pytest.raises(ParamValidationError) as exc_info:
+        get_spider(ParamSpider, kwargs=kwargs)
+    assert "Spider parameter validation failed:" in caplog.text
+    errors = [
+        {key: error[key] for key in ("type", "loc", "msg")}
+        for error in exc_info.value.errors()
+    ]
+    assert errors == expected_errors
+    assert str(exc_info.value).startswith(f"{len(expected_errors)} validation error")
+    unpickled = pickle.loads(pickle.dumps(exc_info.value))  # noqa: S301
+    assert unpickled.errors() == exc_info.value.errors()
+
+
+def test_validate_batch():
+    results = ParamSpider.validate_args_batch({"pages": ["1", "a"]})
+    assert results[0].args == Params(pages=1)
+    assert results[0].errors is None
+    assert results[1].args is None
+    assert results[1].errors is not None
+    assert results[1].errors[0]["loc"] == ("pages",)
+
+
+def test_schema():
+    schema = ParamSpider.get_param_schema(normalize=True)
+    assert schema == EXPECTED_SCHEMA
+    if not USING_PYDANTIC_1:
+        assert schema == {
+            **ModelParamSpider.get_param_schema(normalize=True),
+            "title": "Params",
+        }
+
+
+@pytest.mark.skipif(USING_PYDANTIC_1, reason="Requires Pydantic 2.x")
+def test_schema_pydantic_dataclass():
+    from pydantic import TypeAdapter
+    from pydantic.dataclasses import dataclass
+
+    def get_params() -> type:
+        @dataclasses.dataclass
+        class Params:
+            pages: int
+            color: Optional[Color] = None
+            colors: list[Color] = dataclasses.field(default_factory=list)
+            limit: Optional[int] = dataclasses.field(
+                default=None,
+                metadata={"title": "Item limit", "json_schema_extra": {"x": 1}},
+            )
+            kind: Literal["book"] = "book"
+            urls: Optional[FileLines] = None
+
+        return Params
+
+    class ParamSpider(Args[get_params()], Spider):  # type: ignore[misc]
+        name = "params"
+
+    expected = TypeAdapter(dataclass(get_params())).json_schema()
+    schema = ParamSpider.get_param_schema()
+    # The JSON Schema of single-value literals depends on the Pydantic
+    # version, e.g. Pydantic < 2.7 only sets const.
+    assert schema["properties"].pop("kind") == {
+        "const": "book",
+        "default": "book",
+        "title": "Kind",
+        "type": "string",
+    }
+    del expected["properties"]["kind"]
+    assert schema == expected
+
+
+def test_file_lines(tmp_path):
+    @dataclasses.dataclass
+    class Params:
+        urls: FileLines
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    path = tmp_path / "urls.txt"
+    path.write_text("https://a.example\n")
+    spider = get_spider(ParamSpider, kwargs={"urls": str(path)})
+    assert list(spider.args.urls) == ["https://a.example"]
+    with pytest.raises(ParamValidationError):
+        get_spider(ParamSpider, kwargs={"urls": str(tmp_path / "missing.txt")})
+
+
+def test_post_init():
+    @dataclasses.dataclass
+    class Params:
+        min_pages: int = 0
+        max_pages: int = 10
+
+        def __post_init__(self):
+            if self.min_pages > self.max_pages:
+                raise ValueError("min_pages is greater than max_pages")
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+        args_cache_size = 8
+
+    with pytest.raises(ParamValidationError, match="min_pages is greater"):
+        get_spider(ParamSpider, kwargs={"min_pages": "20"})
+    assert ParamSpider.get_args_cache_info() is None
+
+
+def test_args_cache():
+    @dataclasses.dataclass
+    class Params:
+        pages: int
+        query: str = ""
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+        args_cache_size = 8
+
+    spider1 = get_spider(ParamSpider, kwargs={"pages": "1"})
+    spider2 = get_spider(ParamSpider, kwargs={"pages": "1"})
+    assert spider1.args == spider2.args
+    assert spider1.args is not spider2.args
+    cache_info = ParamSpider.get_args_cache_info()
+    assert cache_info is not None
+    assert cache_info.hits == 1
+
+
+def test_unsupported_type():
+    @dataclasses.dataclass
+    class Params:
+        pages: tuple[int, int]
+
+    class ParamSpider(Args[Params], Spider):
+        name = "params"
+
+    with pytest.raises(TypeError, match="tuple"):
+        ParamSpider.get_param_schema()
+
+
+def test_no_pydantic_import():
+    code = """
+import dataclasses
+import sys
+
+from scrapy import Spider
+from scrapy_spider_metadata import Args, get_spider_metadata
+
+@dataclasses.dataclass
+class Params:
+    pages: int
+
+class ParamSpider(Args[Params], Spider):
+    name = "params"
+
+ParamSpider(pages="1")
+get_spider_metadata(ParamSpider, normalize=True)
+assert "pydantic" not in sys.modules, "pydantic was imported"
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603